@@ -0,0 +1,162 @@
+import html as html_lib
+import pandas as pd
+from nflscraping import caching_functions as cache
+from nflscraping import cleaning_functions as cf
+from nflscraping import clock_functions as clock
+from nflscraping import loading_functions as lf
+
+# boxscore URLs the fixture pages are stored under in the HTML cache; the version is bumped
+# whenever render_boxscore changes, so pages rendered by an older version are not reused
+FIXTURE_URL = 'https://www.pro-football-reference.com/boxscores/fixture_v2_{season}_{week:02d}_{game_id:02d}.htm'
+# number of filler blocks around the tables, bringing a page close to the size of a real boxscore page
+FILLER_BLOCKS = 3000
+
+
+def _cell(tag, value):
+    """
+    Render a table cell, writing whole floats as integers like the site does.
+    """
+    if pd.isna(value):
+        value = ''
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return f'<{tag}>{html_lib.escape(str(value))}</{tag}>'
+
+
+def _row(values):
+    """
+    Render a table row whose first cell is a header cell.
+    """
+    return '<tr>' + ''.join(_cell('th' if i == 0 else 'td', value) for i, value in enumerate(values)) + '</tr>'
+
+
+def _commented_table(wrapper_id, heading, table):
+    """
+    Wrap a table in a comment inside a 'table_wrapper' div, as the site ships it.
+    """
+    return (f'<div id="{wrapper_id}" class="table_wrapper"><div class="section_heading"><h2>{heading}</h2></div>'
+            f'<div class="placeholder"></div>\n<!--\n{table}\n-->\n</div>')
+
+
+def _drive_start(quarter, time):
+    """
+    Return the quarter and clock a drive table gives for a drive whose first play starts at
+    `time` of `quarter`: one second earlier, so that once turned into float start times the drive
+    starts strictly between the previous play and its first play. A drive opening a period starts
+    at 0:01 of the period before, except the opening drive of the game.
+    """
+    minutes, seconds = map(int, time.split(':'))
+    period = clock.OT_MINUTES if quarter >= 5 else clock.REGULATION_MINUTES
+    if minutes * 60 + seconds == period * 60:
+        return (quarter - 1, '0:01') if quarter > 1 else (quarter, time)
+    seconds = minutes * 60 + seconds + 1
+    return quarter, f'{seconds // 60}:{seconds % 60:02d}'
+
+
+def render_boxscore(plays):
+    """
+    Render a Pro Football Reference style boxscore page from the cleaned plays of one game.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        The plays of one game, as in the bundled play data.
+
+    Returns
+    -------
+    str
+        The HTML of the page, with the drive tables of both teams and the play-by-play table in
+        comments, a coin toss row, a timeout row, a divider row, and filler markup around them.
+
+    Notes
+    -----
+    Drives are rebuilt from the changes of possession in `plays`, each starting one second before
+    its first play (see `_drive_start`), so cleaning the page gives back the same plays and
+    possession. 'Play_Type' and 'Yardage' are recomputed from the descriptions by the cleaning,
+    so they match `cleaning_functions.classify_plays` and `cleaning_functions.yards_gained` on
+    `plays` rather than the labels stored with the bundled data.
+    """
+    plays = plays.reset_index(drop=True)
+    teams = {}
+    for location, side in zip(plays['Location'], plays['field_side']):
+        teams.setdefault(side, location.split()[0])
+    home, away = teams['home'], teams['away']
+    mascots = cf.TEAM_MASCOTS
+
+    coin_toss = ['', '', '', '', '', '', '',
+                 f'{mascots[home]} won the coin toss and deferred, {mascots[away]} to receive the opening kickoff.', '', '']
+    rows = [_row(coin_toss)]
+    for play in plays.itertuples(index=False):
+        quarter = 'OT' if play.Quarter == 5 else play.Quarter
+        rows.append(_row([quarter, play.Time, play.Down, play.ToGo, play.Location, play.away, play.home,
+                          play.Detail, f'{play.EPB:.3f}', f'{play.EPA:.3f}']))
+    rows.insert(5, _row([1, '10:00', '', '', '', '', '', f'Timeout #1 by {mascots[home]}', '', '']))
+    rows.insert(40, '<tr class="divider"><td>x</td></tr>')
+    header = ''.join(f'<th>{column}</th>' for column in ['Quarter', 'Time', 'Down', 'ToGo', 'Location', away, home, 'Detail', 'EPB', 'EPA'])
+    pbp = f'<table id="pbp"><thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+    drive_starts = plays[plays['possession'] != plays['possession'].shift()]
+    starts = [_drive_start(quarter, time) for quarter, time in zip(drive_starts['Quarter'], drive_starts['Time'])]
+    drive_starts = drive_starts.assign(drive_quarter=[quarter for quarter, _ in starts], drive_time=[time for _, time in starts])
+    drive_header = ''.join(f'<th>{column}</th>' for column in ['#', 'Quarter', 'Time', 'LOS', 'Plays', 'Length', 'Net Yds', 'Result'])
+    sections = []
+    for side, table_id in (('home', 'home_drives'), ('away', 'vis_drives')):
+        drives = drive_starts[drive_starts['possession'] == side]
+        body = ''.join(_row([i + 1, quarter, time, location, 5, '2:30', 30, 'Punt'])
+                       for i, (quarter, time, location) in enumerate(zip(drives['drive_quarter'], drives['drive_time'], drives['Location'])))
+        table = f'<div class="table_container"><table id="{table_id}"><thead><tr>{drive_header}</tr></thead><tbody>{body}</tbody></table></div>'
+        sections.append(_commented_table(f'all_{table_id}', f'{mascots[teams[side]]} Drives', table))
+    sections.append(_commented_table('all_pbp', 'Play By Play', pbp))
+
+    filler = ''.join(f'<div class="filler"><p>paragraph {i} <a href="/filler/{i}.htm">link</a></p></div>' for i in range(FILLER_BLOCKS))
+    return f'<html><head><title>Boxscore</title></head><body>{filler}{"".join(sections)}{filler}</body></html>'
+
+
+def build_fixtures(cache_dir):
+    """
+    Render every bundled game as a boxscore page and store it in an HTML cache.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the HTML cache. Pages already in it are not rendered again.
+
+    Returns
+    -------
+    list of str
+        The URLs of the fixture pages, in season, week and game order.
+    """
+    links = []
+    for season, week in lf.available_weeks('plays'):
+        plays = lf.load_data(name='plays', season=season, week=week)
+        for game_id, game in plays.groupby('game_id', sort=True):
+            link = FIXTURE_URL.format(season=season, week=week, game_id=game_id)
+            if cache.read_cached_html(link, cache_dir) is None:
+                cache.write_cached_html(link, render_boxscore(game), cache_dir)
+            links.append(link)
+    return links
+
+
+def bundled_plays(games):
+    """
+    Build a play data set of a given number of games by repeating the bundled games.
+
+    Parameters
+    ----------
+    games : int
+        Number of games.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The plays of the bundled weeks, repeated as often as needed, with a distinct 'game_id'
+        for every game.
+    """
+    plays = lf.load_data(name='plays', season=[season for season, _ in lf.available_weeks('plays')])
+    plays = plays.assign(game_id=plays.groupby(['season', 'week', 'game_id'], sort=True).ngroup())
+    bundled = plays['game_id'].max() + 1
+    frames = []
+    for start in range(0, games, bundled):
+        copy = plays[plays['game_id'] < games - start]
+        frames.append(copy.assign(game_id=copy['game_id'] + start + 1))
+    return pd.concat(frames, ignore_index=True)
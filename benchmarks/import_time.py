@@ -0,0 +1,77 @@
+"""
+Import-time budget of the package modules.
+
+Every module is imported in a fresh interpreter, a few times, and the fastest import is kept.
+A module fails the check when its import takes longer than the budget, or when it loads one of
+the heavy optional dependencies (HTTP client, HTML parser, scikit-learn, plotting, ...) that the
+package only imports on first use. The exit status is the number of failures.
+
+Example
+-------
+$ python benchmarks/import_time.py --budget 1.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = [
+    'nflscraping.caching_functions', 'nflscraping.cleaning_functions', 'nflscraping.clock_functions',
+    'nflscraping.database_functions', 'nflscraping.fetching_functions', 'nflscraping.inference_functions',
+    'nflscraping.loading_functions', 'nflscraping.manifest_functions', 'nflscraping.planning_functions',
+    'nflscraping.predict_functions', 'nflscraping.profiling_functions', 'nflscraping.scraping_functions',
+    'nflscraping.tuning_functions', 'nflscraping.writing_functions'
+]
+# dependencies no module may load at import time; pyarrow is not listed since pandas itself
+# imports it when it is installed
+LAZY_DEPENDENCIES = ['requests', 'bs4', 'lxml', 'sklearn', 'joblib', 'matplotlib', 'seaborn']
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=3):
+    """
+    Import a module in fresh interpreters.
+
+    Returns
+    -------
+    dict
+        The fastest import time in 'seconds' and the lazy dependencies it 'loaded'.
+    """
+    runs = []
+    for _ in range(repeat):
+        probe = PROBE.format(module=module, lazy=LAZY_DEPENDENCIES)
+        output = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    return min(runs, key=lambda run: run['seconds'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=1.0, help='seconds a module may take to import')
+    parser.add_argument('--repeat', type=int, default=3, help='imports of every module, the fastest is kept')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='modules to check')
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        problems = []
+        if result['seconds'] > args.budget:
+            problems.append(f"over the {args.budget:.2f} s budget")
+        if result['loaded']:
+            problems.append(f"loads {', '.join(result['loaded'])}")
+        failures += bool(problems)
+        print(f"{module:40} {result['seconds']:.3f} s  {'FAIL: ' + '; '.join(problems) if problems else 'ok'}")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Memory taken by one million plays in the compact schema and in the all-object layout.
+
+The bundled plays are read twice: as strings, the layout the scraper used to return, and with
+the compact types of writing_functions.PLAY_DTYPES, as the scraper and the loader now return
+them. The deep memory usage of every column is scaled to one million plays.
+
+Example
+-------
+$ python benchmarks/memory_footprint.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from nflscraping import writing_functions as wf  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+
+PLAYS = 1_000_000
+
+
+def memory_per_million(frame):
+    """
+    Return the deep memory usage of every column of `frame`, in bytes per million rows.
+    """
+    return frame.memory_usage(deep=True, index=False) * PLAYS / len(frame)
+
+
+def measure(games=272):
+    """
+    Measure the memory per million plays of both layouts.
+
+    Parameters
+    ----------
+    games : int, optional
+        Number of games of the measured play data, made by repeating the bundled games.
+        Default is 272, a regular season.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Bytes per million plays of every column (and the total) in the 'object' and 'compact'
+        layouts, and their ratio.
+    """
+    compact = wf.type_columns(fixtures.bundled_plays(games).drop(columns=['season', 'week']))
+    legacy = compact.astype(object).where(compact.notna(), '').astype(str)
+    table = pd.concat([memory_per_million(legacy), memory_per_million(compact)], axis=1, keys=['object', 'compact'])
+    table.loc['total'] = table.sum()
+    table['ratio'] = table['object'] / table['compact']
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=272, help='number of games of the measured play data')
+    args = parser.parse_args(argv)
+    table = measure(args.games)
+    print(f'MB per {PLAYS:,} plays')
+    print((table[['object', 'compact']] / 1e6).assign(ratio=table['ratio']).to_string(float_format=lambda x: f'{x:.1f}'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
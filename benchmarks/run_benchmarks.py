@@ -0,0 +1,232 @@
+"""
+Offline benchmarks of the scrape, clean and predict pipeline.
+
+Every stage is timed separately on boxscore pages rendered from the bundled play data and on
+the bundled plays themselves, at several numbers of games. Each measurement is written as one
+JSON line, so runs on different commits can be compared with --compare.
+
+The legacy stages (html_parse, get_drive_table, scrape_pbp) build the whole page and dominate a
+full run, which takes about half an hour. Use --games and --stages for a quick check.
+
+Example
+-------
+$ python benchmarks/run_benchmarks.py --output before.jsonl
+$ git checkout my-branch
+$ python benchmarks/run_benchmarks.py --output after.jsonl
+$ python benchmarks/run_benchmarks.py --compare before.jsonl after.jsonl
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from nflscraping import caching_functions as cache  # noqa: E402
+from nflscraping import cleaning_functions as cf  # noqa: E402
+from nflscraping import clock_functions as clock  # noqa: E402
+from nflscraping import predict_functions as pf  # noqa: E402
+from nflscraping import scraping_functions as sf  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+
+SCALES = [1, 16, 272]
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'html_fixtures')
+
+
+def _commit():
+    """
+    Return the hash of the checked out commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _drives(pages):
+    """
+    Build the sorted drive tables the possession stages work on, as clean_game_html does.
+    """
+    drives = []
+    for tables in pages:
+        frames = []
+        for table_id in ('home_drives', 'vis_drives'):
+            frame = pd.DataFrame(columns=tables[table_id]['columns'], data=tables[table_id]['rows'])
+            frame['team'] = tables[table_id]['team']
+            frames.append(frame)
+        game = pd.concat(frames, ignore_index=True)
+        game['Quarter'] = clock.quarter_numbers(game['Quarter'])
+        game['Numeric_time'] = clock.parse_clock(game['Time'])
+        game = game.sort_values(by=['Quarter', 'Numeric_time'], ascending=[True, False]).reset_index(drop=True)
+        game['drive_start_time'] = clock.game_time(clock.elapsed_time(game['Numeric_time'], game['Quarter']))
+        drives.append(game)
+    return drives
+
+
+def _stages(html_pages, plays, n_estimators):
+    """
+    Build the benchmarked stages as (name, function) pairs. Work shared by several stages is done
+    here, outside the timed functions.
+    """
+    tables = [sf.extract_tables(html) for html in html_pages]
+    drives = _drives(tables)
+    play_starts = []
+    for game in tables:
+        pbp = pd.DataFrame(columns=game['pbp']['columns'], data=game['pbp']['rows'][1:])
+        pbp = pbp[pbp['Location'].str.strip() != '']
+        play_starts.append(clock.start_times(pbp['Time'], pbp['Quarter']))
+    X, y = pf.build_features(plays)
+
+    def html_parse():
+        for html in html_pages:
+            BeautifulSoup(html, sf.PARSER)
+
+    def get_drive_table():
+        for html in html_pages:
+            soup = BeautifulSoup(html, sf.PARSER)
+            sf.get_drive_table('home', soup)
+            sf.get_drive_table('vis', soup)
+
+    def scrape_pbp():
+        for html in html_pages:
+            sf.scrape_pbp(BeautifulSoup(html, sf.PARSER))
+
+    def clock_computation():
+        for game in tables:
+            rows = game['pbp']['rows'][1:]
+            clock.start_times([row[1] for row in rows], [row[0] for row in rows])
+
+    def determine_possession():
+        for starts, game in zip(play_starts, drives):
+            [cf.determine_possession(start, game) for start in starts]
+
+    def assign_possession():
+        for starts, game in zip(play_starts, drives):
+            cf.assign_possession(starts, game)
+
+    def fit():
+        RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=1).fit(X, y)
+
+    return [
+        ('html_parse', html_parse),
+        ('extract_tables', lambda: [sf.extract_tables(html) for html in html_pages]),
+        ('get_drive_table', get_drive_table),
+        ('scrape_pbp', scrape_pbp),
+        ('clock', clock_computation),
+        ('determine_possession', determine_possession),
+        ('assign_possession', assign_possession),
+        ('clean_game_html', lambda: [sf.clean_game_html(html) for html in html_pages]),
+        ('play_type', lambda: plays['Detail'].apply(cf.play_type)),
+        ('classify_plays', lambda: cf.classify_plays(plays['Detail'])),
+        ('yards_gained', lambda: cf.yards_gained(plays, by='game_id')),
+        ('build_features', lambda: pf.build_features(plays)),
+        ('fit', fit),
+    ]
+
+
+def run(scales=SCALES, repeat=3, stages=None, fixture_dir=FIXTURE_DIR, n_estimators=400, output=None):
+    """
+    Run the benchmarks and write one JSON line per measurement.
+
+    Parameters
+    ----------
+    scales : list of int, optional
+        Numbers of games to run every stage on. Default is `SCALES`.
+    repeat : int, optional
+        Number of timed runs of every stage. Default is 3.
+    stages : list of str, optional
+        Names of the stages to run. Default is None, meaning every stage.
+    fixture_dir : str, optional
+        HTML cache holding the fixture pages. They are rendered there on the first run.
+    n_estimators : int, optional
+        Number of trees of the fitted forest, 400 as in predict_wins by default.
+    output : file, optional
+        Where the JSON lines are written. Default is None, meaning standard output.
+
+    Returns
+    -------
+    list of dict
+        The records written.
+    """
+    output = output or sys.stdout
+    links = fixtures.build_fixtures(fixture_dir)
+    pages = [cache.read_cached_html(link, fixture_dir) for link in links]
+    context = {'commit': _commit(), 'python': platform.python_version(), 'pandas': pd.__version__,
+               'parser': sf.PARSER, 'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+    records = []
+    for games in scales:
+        html_pages = [pages[i % len(pages)] for i in range(games)]
+        plays = fixtures.bundled_plays(games)
+        selected = [(name, function) for name, function in _stages(html_pages, plays, n_estimators)
+                    if stages is None or name in stages]
+        for name, function in selected:
+            for i in range(repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    function()
+                    seconds = time.perf_counter() - start
+                record = {'stage': name, 'games': games, 'plays': len(plays), 'repeat': i, 'seconds': seconds, **context}
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+                records.append(record)
+    return records
+
+
+def compare(baseline_path, candidate_path, threshold=1.1):
+    """
+    Print the median time of every stage and scale in two result files, flagging regressions.
+
+    Parameters
+    ----------
+    baseline_path, candidate_path : str
+        JSON lines files written by `run`.
+    threshold : float, optional
+        Ratio of candidate to baseline time above which a stage is flagged. Default is 1.1.
+
+    Returns
+    -------
+    int
+        The number of regressions.
+    """
+    medians = []
+    for path in (baseline_path, candidate_path):
+        records = pd.read_json(path, lines=True)
+        medians.append(records.groupby(['stage', 'games'], sort=False)['seconds'].median())
+    table = pd.concat(medians, axis=1, keys=['baseline', 'candidate']).dropna()
+    table['ratio'] = table['candidate'] / table['baseline']
+    table['regression'] = table['ratio'] > threshold
+    print(table.to_string(float_format=lambda x: f'{x:.4f}'))
+    return int(table['regression'].sum())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, nargs='+', default=SCALES, help='numbers of games to run every stage on')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs of every stage')
+    parser.add_argument('--stages', nargs='+', help='only run these stages')
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help='HTML cache the fixture pages are rendered to')
+    parser.add_argument('--n-estimators', type=int, default=400, help='trees of the fitted forest')
+    parser.add_argument('--output', help='JSON lines file to append the results to, standard output by default')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'), help='compare two result files instead')
+    parser.add_argument('--threshold', type=float, default=1.1, help='time ratio flagged as a regression by --compare')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, threshold=args.threshold) else 0
+    with open(args.output, 'a') if args.output else contextlib.nullcontext(sys.stdout) as output:
+        run(args.games, args.repeat, args.stages, args.fixtures, args.n_estimators, output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
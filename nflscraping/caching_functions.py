@@ -0,0 +1,221 @@
+import contextlib
+import gzip
+import hashlib
+import os
+import tempfile
+import time
+
+
+def cache_key(url):
+    """
+    Compute the cache key for a URL.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the cached page.
+
+    Returns
+    -------
+    str
+        The hex SHA-256 digest of the URL.
+
+    Example
+    -------
+    >>> cache_key('https://www.pro-football-reference.com/boxscores/202309070kan.htm')[:8]
+    'ed2f6c1a'
+    """
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def cache_path(url, cache_dir):
+    """
+    Return the path of the compressed HTML file for a URL in the cache.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the cached page.
+    cache_dir : str
+        The directory holding the cache.
+
+    Returns
+    -------
+    str
+        The path of the gzip-compressed page, named after `cache_key(url)`.
+    """
+    return os.path.join(cache_dir, cache_key(url) + '.html.gz')
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """
+    Give a temporary path next to `path` to write to, and move it over `path` once the block ends.
+
+    The temporary file is removed if the block raises, so readers of `path` only ever see the old
+    file or the complete new one, never a partial file.
+
+    Example
+    -------
+    >>> with atomic_path('model.joblib') as tmp_path:
+    ...     joblib.dump(model, tmp_path)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_atomic(path, data):
+    """
+    Write bytes to `path` through a temporary file so readers never see a partial file.
+    """
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+
+def read_cached_html(url, cache_dir):
+    """
+    Read the raw HTML of a page from the cache.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the page.
+    cache_dir : str
+        The directory holding the cache.
+
+    Returns
+    -------
+    str or None
+        The decompressed HTML, or None if the page is not cached.
+
+    Notes
+    -----
+    Reading an entry refreshes its modification time, so size-based eviction in
+    `evict_cache` removes the least recently used pages first.
+    """
+    path = cache_path(url, cache_dir)
+    try:
+        with gzip.open(path, 'rb') as f:
+            html = f.read().decode('utf-8')
+    except FileNotFoundError:
+        return None
+    os.utime(path)
+    return html
+
+
+def write_cached_html(url, html, cache_dir):
+    """
+    Store the raw HTML of a page in the cache.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the page.
+    html : str
+        The raw HTML returned for the URL.
+    cache_dir : str
+        The directory holding the cache. Created if it does not exist.
+
+    Returns
+    -------
+    str
+        The path of the cached file.
+
+    Notes
+    -----
+    The page is gzip-compressed and written atomically next to a small `.url` file
+    recording the URL, which lets `cached_links` list the cache contents.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(url, cache_dir)
+    write_atomic(path[:-len('.html.gz')] + '.url', url.encode('utf-8'))
+    write_atomic(path, gzip.compress(html.encode('utf-8')))
+    return path
+
+
+def cached_links(cache_dir):
+    """
+    List the URLs of every page stored in the cache.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory holding the cache.
+
+    Returns
+    -------
+    list of str
+        The cached URLs, sorted. Boxscore URLs start with the game date, so sorting
+        them also orders the games chronologically.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+    links = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.url'):
+            continue
+        if not os.path.exists(os.path.join(cache_dir, name[:-len('.url')] + '.html.gz')):
+            continue
+        with open(os.path.join(cache_dir, name), 'r', encoding='utf-8') as f:
+            links.append(f.read())
+    return sorted(links)
+
+
+def evict_cache(cache_dir, max_bytes=None, max_age=None):
+    """
+    Remove pages from the cache by age and/or total size.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory holding the cache.
+    max_bytes : int, optional
+        Maximum total size of the compressed pages. The least recently used pages are
+        removed until the cache fits. Default is None, meaning no size limit.
+    max_age : float, optional
+        Maximum age in seconds since a page was last written or read. Older pages are
+        removed. Default is None, meaning no age limit.
+
+    Returns
+    -------
+    int
+        The number of pages removed.
+
+    Example
+    -------
+    >>> evict_cache('html_cache', max_bytes=500 * 1024 ** 2, max_age=90 * 24 * 3600)
+    3
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.html.gz'):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    entries.sort()
+
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, name in entries:
+        too_old = max_age is not None and now - mtime > max_age
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            continue
+        path = os.path.join(cache_dir, name)
+        os.remove(path)
+        url_path = path[:-len('.html.gz')] + '.url'
+        if os.path.exists(url_path):
+            os.remove(url_path)
+        total -= size
+        removed += 1
+    return removed
@@ -1,6 +1,29 @@
 import re
 import pandas as pd
 import numpy as np
+from nflscraping import clock_functions as clock
+
+# team abbreviations used by Pro Football Reference, mapped to team mascots
+TEAM_MASCOTS = {
+    'MIA': 'Dolphins', 'BUF': 'Bills', 'NYJ': 'Jets', 'NWE': 'Patriots',
+    'PHI': 'Eagles', 'DAL': 'Cowboys', 'NYG': 'Giants', 'WAS': 'Commanders',
+    'BAL': 'Ravens', 'PIT': 'Steelers', 'CLE': 'Browns', 'CIN': 'Bengals',
+    'DET': 'Lions', 'MIN': 'Vikings', 'GNB': 'Packers', 'CHI': 'Bears',
+    'JAX': 'Jaguars', 'IND': 'Colts', 'HOU': 'Texans', 'TEN': 'Titans',
+    'ATL': 'Falcons', 'NOR': 'Saints', 'TAM': 'Buccaneers', 'CAR': 'Panthers',
+    'KAN': 'Chiefs', 'DEN': 'Broncos', 'LVR': 'Raiders', 'LAC': 'Chargers',
+    'SFO': '49ers', 'SEA': 'Seahawks', 'LAR': 'Rams', 'ARI': 'Cardinals'
+}
+MASCOT_TEAMS = {mascot: team for team, mascot in TEAM_MASCOTS.items()}
+
+# play types returned by classify_plays
+PLAY_TYPES = ['Pass', 'Run', 'Sack', 'Scramble', 'Kneel', 'Spike', 'Kickoff', 'Punt', 'Field Goal',
+              'Extra Point', 'Two Point', 'Penalty']
+PLAY_TYPE_DTYPE = pd.CategoricalDtype(PLAY_TYPES)
+# play types that gain or lose yards from scrimmage
+SCRIMMAGE_PLAY_TYPES = ['Pass', 'Run', 'Sack', 'Scramble']
+(PASS, RUN, SACK, SCRAMBLE, KNEEL, SPIKE, KICKOFF, PUNT, FIELD_GOAL,
+ EXTRA_POINT, TWO_POINT, PENALTY) = range(len(PLAY_TYPES))
 
 
 def elapsed_time(time_list):
@@ -21,7 +44,7 @@ def elapsed_time(time_list):
     -----
     This function calculates the elapsed time between plays in an nfl game based off of `time_list`.
     It considers scenarios where the times may wrap around from the end of one quarter to the
-    beginning of the next quarter.
+    beginning of the next quarter. It is a list-returning wrapper around `clock_functions.elapsed_time`.
 
     Examples
     --------
@@ -31,23 +54,7 @@ def elapsed_time(time_list):
     [20, 300, 100, 200]
     """
 
-    time_list = time_list.tolist()
-    elapsed_times = []
-    length = len(time_list)
-    for i in range(0,length-1):
-        time1 = time_list[i]
-        time2 = time_list[i+1]
-        if time1 > time2:
-            elapsed = time1 - time2
-            elapsed_times.append(elapsed)
-        elif time1 == time2:
-            elapsed = 0
-            elapsed_times.append(elapsed)
-        else:
-            elapsed = (time1) + (15-time2)
-            elapsed_times.append(elapsed)
-    elapsed_times.append(time_list[length-1])
-    return elapsed_times
+    return clock.elapsed_time(time_list).tolist()
 
 
 def game_time(elapsed_time):
@@ -67,7 +74,8 @@ def game_time(elapsed_time):
     Notes
     -----
     This function computes the cumulative real game time at each event based on a list of elapsed times.
-    It starts with an initial time of 0 and adds the elapsed times sequentially.
+    It starts with an initial time of 0 and adds the elapsed times sequentially. It is a list-returning
+    wrapper around `clock_functions.game_time`.
 
     Examples
     --------
@@ -77,13 +85,7 @@ def game_time(elapsed_time):
     [0, 20, 320, 420, 620, 720]
     """
 
-    elapsed_time = elapsed_time.tolist()
-    real_game_time = []
-    real_game_time.append(0)
-    for i in range(0,len(elapsed_time)-1):
-        time = real_game_time[i] + elapsed_time[i]
-        real_game_time.append(time)
-    return real_game_time
+    return clock.game_time(elapsed_time).tolist()
 
 
 def play_type(play_description):
@@ -106,6 +108,9 @@ def play_type(play_description):
     keywords such as 'pass' or 'scrambles' for passing plays, and 'kicks' or 'punts' for special
     teams plays. If none of these conditions are met, it assumes a running play.
 
+    `classify_plays` is the version used by the scraping functions. It classifies a column of
+    descriptions into a finer set of play types.
+
     Examples
     --------
     >>> play_type('Pass completed to wide receiver')
@@ -124,7 +129,83 @@ def play_type(play_description):
         return "Special Teams"
     else: 
             return "Run"
-        
+
+
+def _play_type_code(detail):
+    """
+    Return the position in `PLAY_TYPES` of the type of a play description.
+
+    Phrases are matched case sensitively, as Pro Football Reference writes them, so penalty names
+    such as 'Defensive Pass Interference' do not make a play a pass. Passes, the most frequent
+    type, are settled by two substring tests; runs only after every other phrase is ruled out.
+    """
+    if '(no play)' in detail:
+        return PENALTY
+    if 'pass' in detail:
+        return TWO_POINT if detail.startswith('Two Point Attempt') else PASS
+    if 'punts' in detail:
+        return PUNT
+    if 'sacked' in detail:
+        return SACK
+    if 'scrambles' in detail:
+        return SCRAMBLE
+    if 'kicks off' in detail or 'kicks onside' in detail:
+        return KICKOFF
+    if 'kneels' in detail:
+        return KNEEL
+    if 'field goal' in detail:
+        return FIELD_GOAL
+    if 'extra point' in detail:
+        return EXTRA_POINT
+    if 'spiked' in detail:
+        return SPIKE
+    if detail.startswith('Two Point Attempt'):
+        return TWO_POINT
+    if detail.startswith('Penalty on'):
+        return PENALTY
+    return RUN
+
+
+def classify_plays(details):
+    """
+    Determine the type of every play from its description.
+
+    Parameters
+    ----------
+    details : list-like
+        The play descriptions, e.g. the 'Detail' column of play-by-play data.
+
+    Returns
+    -------
+    pandas.Categorical
+        The play types, with the categories in `PLAY_TYPES`: 'Pass', 'Run', 'Sack', 'Scramble',
+        'Kneel', 'Spike', 'Kickoff', 'Punt', 'Field Goal', 'Extra Point', 'Two Point' and 'Penalty'.
+
+    Notes
+    -----
+    Unlike `play_type`, sacks, scrambles, kneels, spikes, field goals, extra points and two point
+    attempts get their own type instead of landing in 'Run' or 'Pass'. A play called back by a
+    penalty ('(no play)' in the description) or a penalty without a play is a 'Penalty'. Anything
+    else, including aborted snaps, is a 'Run'. Missing descriptions are runs.
+
+    The descriptions are matched as written, without lowercasing. Each play still costs a few
+    substring tests, up to a dozen for a run, so this is about as fast as `play_type` rather than
+    faster: its value is the finer taxonomy, not speed.
+
+    Examples
+    --------
+    >>> classify_plays(['Josh Allen pass complete short right to Stefon Diggs for 7 yards',
+    ...                 'Aaron Rodgers sacked by Leonard Floyd for -10 yards',
+    ...                 'Evan McPherson 51 yard field goal no good',
+    ...                 'Penalty on Laken Tomlinson: False Start, 5 yards (accepted) (no play)'])
+    ['Pass', 'Sack', 'Field Goal', 'Penalty']
+    Categories (12, object): ['Pass', 'Run', 'Sack', 'Scramble', ..., 'Field Goal', 'Extra Point',
+                              'Two Point', 'Penalty']
+    """
+    values = pd.Series(details, dtype=object).fillna('').tolist()
+    codes = np.fromiter(map(_play_type_code, values), dtype=np.int8, count=len(values))
+    return pd.Categorical.from_codes(codes, dtype=PLAY_TYPE_DTYPE)
+
 
 def determine_possession(play_start, drives):
     """
@@ -165,14 +246,6 @@ def determine_possession(play_start, drives):
     None
     """
     
-    team_data = ['MIA', 'BUF', 'NYJ', 'NWE', 'PHI', 'DAL', 'NYG', 'WAS', 'BAL', 'PIT', 'CLE', 'CIN', 'DET', 'MIN', 'GNB', 'CHI', 'JAX', 'IND', 'HOU',
-                    'TEN', 'ATL','NOR', 'TAM', 'CAR', 'KAN', 'DEN', 'LVR', 'LAC', 'SFO', 'SEA', 'LAR', 'ARI']
-    mascot_data = ['Dolphins', 'Bills', 'Jets', 'Patriots', 'Eagles', 'Cowboys', 'Giants', 'Commanders', 'Ravens', 'Steelers', 'Browns', 'Bengals', 'Lions', 'Vikings', 'Packers', 'Bears',
-                    'Jaguars', 'Colts', 'Texans', 'Titans', 'Falcons', 'Saints', 'Buccaneers', 'Panthers', 'Chiefs', 'Broncos', 'Raiders', 'Chargers', '49ers', 'Seahawks', 'Rams',
-                    'Cardinals']
-
-    teams = pd.DataFrame({'Team' : team_data, 'Mascot' : mascot_data})
-
     closest_drive_team = None
 
     for drive_start, drive_team in zip(drives['drive_start_time'], drives['team']):
@@ -181,13 +254,109 @@ def determine_possession(play_start, drives):
             else:
                 break
 
-    for i, mascot in enumerate(teams['Mascot']):
-        if closest_drive_team == mascot :
-            possession = teams['Team'][i]
-            break
+    return MASCOT_TEAMS.get(closest_drive_team)
+
+
+def assign_possession(play_starts, drives):
+    """
+    Determine which team possesses the ball at the start of every play of a game at once.
+
+    Parameters
+    ----------
+    play_starts : list-like
+        The start times of the plays.
+    drives : pandas.DataFrame
+        A DataFrame containing drive information, with a 'drive_start_time' column sorted in
+        ascending order and a 'team' column with the team mascots.
+
+    Returns
+    -------
+    possession : numpy.ndarray
+        The abbreviation of the team in possession at the start of each play, or None where
+        the play starts before the first drive.
+
+    Notes
+    -----
+    This is the batch version of `determine_possession`. Each play is assigned to the last drive
+    that started before or at the same time as the play, found with a single binary search
+    (`numpy.searchsorted`) over the drive start times.
+
+    Examples
+    --------
+    >>> drives_data = pd.DataFrame({
+    ...     'drive_start_time': [0, 180, 400],
+    ...     'team': ['Chiefs', 'Lions', 'Chiefs']
+    ... })
+    >>> assign_possession([50, 200, 600], drives_data)
+    array(['KAN', 'DET', 'KAN'], dtype=object)
+    """
+    drive_starts = np.asarray(drives['drive_start_time'], dtype=float)
+    drive_teams = drives['team'].map(MASCOT_TEAMS).to_numpy(dtype=object)
+    drive_index = np.searchsorted(drive_starts, np.asarray(play_starts, dtype=float), side='right') - 1
+    if len(drive_teams) == 0:
+        return np.full(len(drive_index), None, dtype=object)
+    possession = drive_teams[np.maximum(drive_index, 0)]
+    possession[drive_index < 0] = None
     return possession
 
 
+def summarize_drives(plays, drives):
+    """
+    Build the drive summary table of a game from its scraped drive rows and its plays.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        The plays of one game in game order, with a 'play_start_time' column.
+    drives : pandas.DataFrame
+        The drive rows of both teams scraped from the drive tables, sorted by
+        'drive_start_time', with the 'Quarter', 'Time', 'LOS', 'Plays', 'Length', 'Net Yds' and
+        'Result' columns of the site and a 'possession' column ('home' or 'away').
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per drive with its number ('drive', from 1), 'possession', the scraped columns,
+        'start_time' and 'end_time' (minutes of game time, the end being the start plus the
+        drive 'Length'), and 'first_play' and 'last_play', the positions of its first and last
+        play among the plays of the game. Drives without any play have no span.
+
+    Notes
+    -----
+    Plays are matched to drives with the same binary search as `assign_possession`, and the
+    spans come from one groupby over the matched positions, so no play is visited in Python.
+
+    Example
+    -------
+    >>> drives = summarize_drives(pbp_data, drives)
+    >>> drives.loc[drives['Result'] == 'Touchdown', ['possession', 'Plays', 'Net Yds']]
+    """
+    drives = drives.reset_index(drop=True)
+    drive_starts = np.asarray(drives['drive_start_time'], dtype=float)
+    drive_index = np.searchsorted(drive_starts, np.asarray(plays['play_start_time'], dtype=float), side='right') - 1
+    matched = drive_index >= 0
+    spans = pd.Series(np.arange(len(plays))[matched]).groupby(drive_index[matched]).agg(['min', 'max'])
+    spans = spans.reindex(range(len(drives)))
+
+    duration = drives['Length'].astype(str).str.extract(r'([0-9]+):([0-9]+)').astype(float)
+    summary = pd.DataFrame({
+        'drive': np.arange(1, len(drives) + 1),
+        'possession': drives['possession'].to_numpy(),
+        'Quarter': drives['Quarter'].to_numpy(),
+        'Time': drives['Time'].to_numpy(),
+        'LOS': drives['LOS'].to_numpy(),
+        'Plays': pd.to_numeric(drives['Plays'], errors='coerce').to_numpy(),
+        'Length': drives['Length'].to_numpy(),
+        'Net Yds': pd.to_numeric(drives['Net Yds'], errors='coerce').to_numpy(),
+        'Result': drives['Result'].to_numpy(),
+        'start_time': drive_starts,
+        'end_time': drive_starts + (duration[0] + duration[1] / 60).to_numpy(),
+        'first_play': spans['min'].to_numpy(),
+        'last_play': spans['max'].to_numpy()
+    })
+    return summary
+
+
 def calculate_yardage(current_yardline, next_yardline):
     """
     Calculate the yardage gained or lost between two yardlines.
@@ -207,7 +376,7 @@ def calculate_yardage(current_yardline, next_yardline):
     return next_yardline - current_yardline
 
 
-def yards_gained(plays):
+def yards_gained(plays, by=None):
     """
     Calculate the yardage gained or lost for each play in a given set of plays.
 
@@ -215,42 +384,54 @@ def yards_gained(plays):
     ----------
     plays : pandas.DataFrame
         A DataFrame containing information about each play, including columns:
-        - 'Play_Type': str, the type of play ('Run', 'Pass', etc.).
+        - 'Play_Type': str, the type of play, see `classify_plays`.
         - 'possession': str, the team in possession of the ball.
         - 'field_side': str, the side of the field where the play occurs.
         - 'yardline': int, the yardline where the play starts.
+    by : str or list of str, optional
+        Column(s) identifying the game of each play, e.g. 'game_id'. When given, each play is
+        compared with the next play of the same game only, so a frame holding many games can be
+        processed at once. Default is None, meaning `plays` holds a single game.
 
     Returns
     -------
-    yardage_gained_list : list of int
+    yardage_gained_list : list of float
         A list containing the yardage gained (positive) or lost (negative) for each play.
+
+    Notes
+    -----
+    Yardage is the difference between the yardline of a play and the yardline of the next play,
+    both measured from the side of the team with the ball. When possession changes and both plays
+    are on the same side of the field, the current yardline is flipped to 100 - yardline. Plays
+    whose type is not in `SCRIMMAGE_PLAY_TYPES` (passes, runs, sacks and scrambles) gain 0 yards,
+    and the last play of a game gains NaN.
+
+    Example
+    -------
+    >>> plays['Yardage'] = yards_gained(plays, by='game_id')
     """
     plays = pd.DataFrame(plays).reset_index(drop = True)
-    
+
     # If the team with the ball is on the opposite side, subtract the yardline from 100
-    plays['yardline'] = np.where(plays['possession'] != plays['field_side'], 100 - plays['yardline'], plays['yardline'])
-
-    yardage_gained_list = []
-
-    for index, row in plays.iterrows():
-        # Check if the play type is 'Run' or 'Pass'
-        if row['Play_Type'] in ['Run', 'Pass']:
-            if row['possession'] != plays['possession'].shift(-1).iloc[index]:
-                # Check if the current and next plays are on the same side of the field
-                if row['field_side'] == plays['field_side'].shift(-1).iloc[index]:
-                    # Update current play's yardline to 100 - yardline
-                    yardline = 100 - row['yardline']
-                else:
-                        yardline = row['yardline']
-            else:
-                yardline = row['yardline']
+    raw_yardline = plays['yardline'].astype(float)
+    yardline = pd.Series(np.where(plays['possession'] != plays['field_side'], 100 - raw_yardline, raw_yardline))
 
-            yardage_gained = calculate_yardage(yardline, plays['yardline'].shift(-1).iloc[index])
-        else: 
-            yardage_gained = 0.0
-        # Append the calculated yardage gained to the list
-        yardage_gained_list.append(yardage_gained)
-    return yardage_gained_list
+    if by is None:
+        next_possession = plays['possession'].shift(-1)
+        next_field_side = plays['field_side'].shift(-1)
+        next_yardline = yardline.shift(-1)
+    else:
+        groups = [plays[column] for column in ([by] if isinstance(by, str) else by)]
+        next_possession = plays.groupby(groups, sort=False)['possession'].shift(-1)
+        next_field_side = plays.groupby(groups, sort=False)['field_side'].shift(-1)
+        next_yardline = yardline.groupby(groups, sort=False).shift(-1)
+
+    # On a change of possession with both plays on the same side, flip the current yardline
+    flip = (plays['possession'] != next_possession) & (plays['field_side'] == next_field_side)
+    start_yardline = np.where(flip, 100 - yardline, yardline)
+    yardage_gained = calculate_yardage(start_yardline, next_yardline)
+
+    return np.where(plays['Play_Type'].isin(SCRIMMAGE_PLAY_TYPES), yardage_gained, 0.0).tolist()
 
 
 def seconds_left(plays):
@@ -412,3 +593,81 @@ def win(plays):
     
     return Y
 
+
+
+def _final_play_points(detail, possession):
+    """
+    Return the (away, home) points scored by a play, read from its description.
+
+    Touchdowns of interception, fumble, punt and kickoff returns go to the team not in
+    possession, like safeties; other touchdowns, field goals, extra points and two point
+    conversions go to the team in possession. A play called back by a penalty scores nothing.
+    """
+    detail = detail if isinstance(detail, str) else ''
+    if '(no play)' in detail or possession not in ('away', 'home'):
+        return 0, 0
+    scorer, points = possession, 0
+    if 'touchdown' in detail:
+        points = 6
+        if any(phrase in detail for phrase in ('intercepted', 'fumbles', 'punts', 'kicks off', 'kicks onside')):
+            scorer = 'home' if possession == 'away' else 'away'
+    elif 'field goal good' in detail:
+        points = 3
+    elif 'extra point good' in detail:
+        points = 1
+    elif detail.startswith('Two Point Attempt') and 'succeeds' in detail:
+        points = 2
+    elif 'safety' in detail.lower():
+        points = 2
+        scorer = 'home' if possession == 'away' else 'away'
+    return (points, 0) if scorer == 'away' else (0, points)
+
+
+def win_labels(plays, by='game_id'):
+    """
+    Label every play with whether the team in possession goes on to win its game.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        A DataFrame containing plays of one or more games in game order, with 'away', 'home'
+        (scores before the play), 'possession' ('away' or 'home') and 'Detail' columns.
+    by : str, optional
+        Column identifying the game of each play. Default is 'game_id'. If the column is
+        missing, `plays` is treated as a single game.
+
+    Returns
+    -------
+    pandas.Series
+        1.0 where the team in possession wins the game, 0.0 where it loses, and NaN for the plays
+        of a game ending in a tie, aligned with `plays`.
+
+    Notes
+    -----
+    This is the whole-column version of `win`. Each row holds the score before its play, so the
+    final score of a game is the score of its last play plus the points that play scored, see
+    `_final_play_points`; a walk-off touchdown or field goal decides the winner. Unlike `win`,
+    ties are not given to the away team but left unlabeled, and so are games whose last play
+    scores in a way the description does not tell.
+
+    Examples
+    --------
+    >>> plays_data = {'game_id': [1, 1, 2, 2], 'away': [0, 7, 3, 3], 'home': [3, 3, 0, 7],
+    ...               'possession': ['away', 'home', 'home', 'home'],
+    ...               'Detail': ['', '', '', 'Jake Elliott 44 yard field goal good']}
+    >>> win_labels(pd.DataFrame(plays_data)).tolist()
+    [1.0, 0.0, 1.0, 1.0]
+    """
+    scores = plays[['away', 'home']].astype(float)
+    games = plays[by] if by in plays.columns else pd.Series(0, index=plays.index)
+    last = ~games.duplicated(keep='last').to_numpy()
+    details = plays['Detail'] if 'Detail' in plays.columns else pd.Series('', index=plays.index)
+    points = [_final_play_points(detail, possession)
+              for detail, possession in zip(details[last], plays['possession'][last].astype(object))]
+    final = scores[last].to_numpy() + np.array(points, dtype=float).reshape(-1, 2)
+    winner = pd.Series(np.where(final[:, 0] > final[:, 1], 'away', np.where(final[:, 0] < final[:, 1], 'home', None)),
+                       index=games[last].to_numpy())
+    winner = winner.reindex(games.to_numpy()).to_numpy()
+    labels = (plays['possession'].astype(object).to_numpy() == winner).astype(float)
+    labels[pd.isna(winner)] = np.nan
+    return pd.Series(labels, index=plays.index)
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+REGULATION_MINUTES = 15
+# overtime periods last 10 minutes in the regular season and 15 minutes in the playoffs
+OT_MINUTES = 10
+PLAYOFF_OT_MINUTES = 15
+
+
+def quarter_numbers(quarters):
+    """
+    Convert quarter labels to quarter numbers.
+
+    Parameters
+    ----------
+    quarters : list-like
+        Quarter labels as scraped, e.g. '1' to '4' or 'OT', or numbers.
+
+    Returns
+    -------
+    numpy.ndarray
+        An integer array of quarter numbers, where overtime is 5.
+
+    Examples
+    --------
+    >>> quarter_numbers(['1', '4', 'OT'])
+    array([1, 4, 5])
+    """
+    return pd.Series(quarters).replace('OT', 5).astype(int).to_numpy()
+
+
+def parse_clock(times):
+    """
+    Convert game clock strings to minutes left in the period.
+
+    Parameters
+    ----------
+    times : list-like
+        Game clock readings formatted as 'MM:SS'.
+
+    Returns
+    -------
+    numpy.ndarray
+        A float array with the minutes left in the period, i.e. minutes + seconds / 60.
+
+    Examples
+    --------
+    >>> parse_clock(['15:00', '7:30', '0:06'])
+    array([15. ,  7.5,  0.1])
+    """
+    parts = pd.Series(times).str.extract(r'([0-9]+):([0-9]+)').astype(int).to_numpy()
+    return parts[:, 0] + parts[:, 1] / 60
+
+
+def overtime_minutes(clock, quarters):
+    """
+    Infer the length of the overtime periods of a game from its clock readings.
+
+    Parameters
+    ----------
+    clock : list-like
+        Minutes left in the period for each event.
+    quarters : list-like
+        Quarter number of each event, 5 or more being overtime.
+
+    Returns
+    -------
+    int
+        `PLAYOFF_OT_MINUTES` if a reading in overtime shows more than `OT_MINUTES` left, which only
+        a playoff overtime period does, otherwise `OT_MINUTES`.
+
+    Examples
+    --------
+    >>> overtime_minutes([2.0, 15.0, 12.5], [4, 5, 5])
+    15
+    """
+    clock = np.asarray(clock, dtype=float)
+    overtime = np.asarray(quarters) >= 5
+    return PLAYOFF_OT_MINUTES if np.any(clock[overtime] > OT_MINUTES) else OT_MINUTES
+
+
+def elapsed_time(clock, quarters=None, ot_minutes=OT_MINUTES):
+    """
+    Calculate the elapsed time between consecutive game clock readings.
+
+    Parameters
+    ----------
+    clock : list-like
+        Minutes left in the period for each event, in game order.
+    quarters : list-like, optional
+        Quarter number of each event. When given, a clock that wraps into overtime (quarter 5
+        or later) is measured against an `ot_minutes` period. Default is None, meaning every
+        period is `REGULATION_MINUTES` long.
+    ot_minutes : float, optional
+        Length of the overtime periods, `PLAYOFF_OT_MINUTES` for a playoff game. Default is
+        `OT_MINUTES`, the regular season length.
+
+    Returns
+    -------
+    numpy.ndarray
+        The elapsed minutes between each event and the next one. The last element is the
+        time left on the clock at the last event.
+
+    Notes
+    -----
+    When the clock goes up between two events a new period has started, and the elapsed time
+    is the time left in the old period plus the time already run off in the new one.
+
+    Examples
+    --------
+    >>> elapsed_time([15, 12.5, 1, 14, 10])
+    array([ 2.5, 11.5,  2. ,  4. , 10. ])
+    """
+    clock = np.asarray(clock, dtype=float)
+    if len(clock) == 0:
+        return clock
+    current = clock[:-1]
+    following = clock[1:]
+    period = np.full(len(following), float(REGULATION_MINUTES))
+    if quarters is not None:
+        quarters = np.asarray(quarters)
+        period[quarters[1:] >= 5] = ot_minutes
+    elapsed = np.where(current > following, current - following,
+                       np.where(current == following, 0, current + (period - following)))
+    return np.append(elapsed, clock[-1])
+
+
+def game_time(elapsed):
+    """
+    Calculate the cumulative game time at each event from the elapsed times between events.
+
+    Parameters
+    ----------
+    elapsed : list-like
+        Elapsed minutes between consecutive events, as returned by `elapsed_time`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The minutes of game time played before each event, starting at 0.
+
+    Examples
+    --------
+    >>> game_time([2.5, 11.5, 2, 4, 10])
+    array([ 0. ,  2.5, 14. , 16. , 20. ])
+    """
+    elapsed = np.asarray(elapsed, dtype=float)
+    if len(elapsed) == 0:
+        return elapsed
+    return np.concatenate(([0.0], np.cumsum(elapsed[:-1])))
+
+
+def start_times(times, quarters, ot_minutes=None):
+    """
+    Calculate the game time at which each event starts from its quarter and game clock.
+
+    Parameters
+    ----------
+    times : list-like
+        Game clock readings formatted as 'MM:SS', in game order.
+    quarters : list-like
+        Quarter labels or numbers of the events, 'OT' being overtime.
+    ot_minutes : float, optional
+        Length of the overtime periods. Default is None, meaning it is inferred from the clock
+        readings with `overtime_minutes`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The minutes of game time played before each event.
+
+    Example
+    -------
+    >>> pbp_data['play_start_time'] = start_times(pbp_data['Time'], pbp_data['Quarter'])
+    """
+    clock = parse_clock(times)
+    quarters = quarter_numbers(quarters)
+    if ot_minutes is None:
+        ot_minutes = overtime_minutes(clock, quarters)
+    return game_time(elapsed_time(clock, quarters, ot_minutes))
@@ -0,0 +1,271 @@
+import contextlib
+import sqlite3
+import pandas as pd
+from nflscraping import writing_functions as wf
+
+# tables of the store and their columns, each keyed by season, week and game_id
+TABLES = {
+    'games': wf.GAME_COLUMNS,
+    'plays': [column for column in wf.PLAY_COLUMNS if column != 'posession'],
+    'drives': wf.DRIVE_COLUMNS
+}
+PARTITION_COLUMNS = ['season', 'week']
+INDEXES = {
+    'games_key': ('games', ['season', 'week', 'game_id']),
+    'games_away_team': ('games', ['away_team', 'season', 'week']),
+    'games_home_team': ('games', ['home_team', 'season', 'week']),
+    'plays_game': ('plays', ['season', 'week', 'game_id']),
+    'plays_quarter': ('plays', ['Quarter', 'Down']),
+    'plays_down': ('plays', ['Down', 'Quarter']),
+    'plays_play_type': ('plays', ['Play_Type', 'Quarter', 'Down']),
+    'drives_game': ('drives', ['season', 'week', 'game_id'])
+}
+
+
+def _quote(name):
+    """
+    Quote an SQL identifier, e.g. the 'Net Yds' column.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_type(column):
+    """
+    Return the SQLite column type matching the compact pandas type of a column.
+    """
+    dtype = wf.PARQUET_DTYPES.get(column)
+    if column in PARTITION_COLUMNS or str(dtype).lower().startswith('int'):
+        return 'INTEGER'
+    if str(dtype).startswith('float'):
+        return 'REAL'
+    return 'TEXT'
+
+
+def connect(path):
+    """
+    Open a SQLite store of play, drive and game data, creating its tables and indexes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file. Created if it does not exist.
+
+    Returns
+    -------
+    sqlite3.Connection
+        The connection, with write-ahead logging enabled so reads are not blocked by a scraper
+        writing to the store.
+
+    Notes
+    -----
+    Every table has 'season', 'week' and 'game_id' columns identifying the game, indexed in every
+    table. Games are indexed by away and home team, and plays by quarter, down and play type,
+    see `INDEXES`.
+
+    Example
+    -------
+    >>> with contextlib.closing(connect('nfl.db')) as connection:
+    ...     connection.execute('SELECT COUNT(*) FROM plays').fetchone()
+    """
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    for table, columns in TABLES.items():
+        definitions = ', '.join(f'{_quote(column)} {_sql_type(column)}' for column in PARTITION_COLUMNS + columns)
+        connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({definitions})')
+    for name, (table, columns) in INDEXES.items():
+        connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(_quote(column) for column in columns)})')
+    connection.commit()
+    return connection
+
+
+def table_for(columns):
+    """
+    Return the name of the table holding the given columns, e.g. 'plays' for `writing_functions.PLAY_COLUMNS`.
+    """
+    columns = [column for column in columns if column != 'posession']
+    for table, table_columns in TABLES.items():
+        if columns == table_columns:
+            return table
+    raise ValueError(f'No table of the store has the columns {columns}.')
+
+
+def _rows(frame):
+    """
+    Convert a frame to a list of row tuples of plain Python values, None standing for missing values.
+    """
+    columns = []
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_float_dtype(values):
+            values = values.astype('float64')
+        # nullable integer columns give numpy scalars, which sqlite3 does not bind
+        columns.append([None if pd.isna(value) else getattr(value, 'item', lambda: value)() for value in values.tolist()])
+    return list(zip(*columns))
+
+
+class SqliteWriter:
+    """
+    SQLite sink that inserts each frame into a table of the store in one transaction.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file, opened with `connect`.
+    columns : list of str
+        Columns of the output, those of one of the `TABLES`.
+    partition : dict, optional
+        Season and week of the rows, e.g. {'season': 2023, 'week': 1}. Default is None,
+        meaning they are left empty.
+    append : bool, optional
+        If False, rows of the same table and partition left by an earlier run are deleted first,
+        only those without a season and week if there is no partition. Default is False.
+
+    Notes
+    -----
+    Columns are typed with `writing_functions.type_columns` before they are inserted, and every
+    call to `write` is committed before returning, so an interrupted run leaves every game
+    written so far. `position` is the last rowid of the table, and `truncate` deletes the rows
+    of the partition inserted after it.
+
+    Example
+    -------
+    >>> scrape_games(game_urls, 'nfl.db', 'nfl.db', data_format='sqlite', season=2023, week=1,
+    ...              drive_file_path='nfl.db')
+    """
+
+    def __init__(self, path, columns, partition=None, append=False):
+        self.table = table_for(columns)
+        self.columns = list(columns)
+        self.partition = partition or {}
+        self._connection = connect(path)
+        if not append:
+            self._connection.execute(f'DELETE FROM {self.table} WHERE season IS ? AND week IS ?',
+                                     (self.partition.get('season'), self.partition.get('week')))
+            self._connection.commit()
+
+    def write(self, frame):
+        """
+        Insert the rows of `frame` into the table and commit them.
+        """
+        frame = wf.type_columns(frame.reindex(columns=self.columns))
+        frame.insert(0, 'week', self.partition.get('week'))
+        frame.insert(0, 'season', self.partition.get('season'))
+        placeholders = ', '.join('?' for _ in frame.columns)
+        names = ', '.join(_quote(column) for column in frame.columns)
+        with self._connection:
+            self._connection.executemany(f'INSERT INTO {self.table} ({names}) VALUES ({placeholders})', _rows(frame))
+
+    def position(self):
+        """
+        Return the last rowid of the table, the point `truncate` can later cut the partition back to.
+        """
+        return self._connection.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM {self.table}').fetchone()[0]
+
+    def truncate(self, position):
+        """
+        Delete the rows of the partition inserted after `position`, a value returned by `position`.
+        """
+        with self._connection:
+            self._connection.execute(f'DELETE FROM {self.table} WHERE season IS ? AND week IS ? AND rowid > ?',
+                                     (self.partition.get('season'), self.partition.get('week'), position))
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def query(path, sql, params=()):
+    """
+    Run a query on the store and return its result as a DataFrame.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file.
+    sql : str
+        The SELECT statement, with ? placeholders.
+    params : sequence, optional
+        Values of the placeholders. Default is no values.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The result, with the columns of the store converted to their compact types.
+
+    Example
+    -------
+    >>> query('nfl.db', 'SELECT Play_Type, AVG(Yardage) AS yards FROM plays WHERE Down = ? GROUP BY Play_Type', (3,))
+    """
+    with contextlib.closing(sqlite3.connect(path)) as connection:
+        frame = pd.read_sql_query(sql, connection, params=list(params))
+    return wf.type_columns(frame)
+
+
+def select_plays(path, season=None, week=None, team=None, offense=None, quarter=None, down=None, play_type=None, columns=None):
+    """
+    Load the plays matching a few filters from the store, using its indexes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file.
+    season, week : int or list of int, optional
+        Season(s) and week(s) of the plays. Default is None, meaning all.
+    team : str or list of str, optional
+        Team abbreviation(s). Only plays of games involving these teams are loaded. Default is None.
+    offense : str or list of str, optional
+        Team abbreviation(s) of the team in possession. Default is None.
+    quarter, down : int or list of int, optional
+        Quarter(s), 5 being overtime, and down(s) of the plays. Default is None.
+    play_type : str or list of str, optional
+        Play type(s), see `cleaning_functions.PLAY_TYPES`. Default is None.
+    columns : list of str, optional
+        Columns of the plays to load. Default is None, meaning every column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The matching plays, with 'season' and 'week' columns, in the compact schema.
+
+    Example
+    -------
+    >>> select_plays('nfl.db', offense='KAN', quarter=4, down=3, play_type='Pass')
+    """
+    conditions = []
+    params = []
+
+    def condition(column, values):
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        conditions.append(f'{column} IN ({", ".join("?" for _ in values)})')
+        params.extend(values)
+
+    for column, values in (('p.season', season), ('p.week', week), ('p.Quarter', quarter), ('p.Down', down), ('p.Play_Type', play_type)):
+        if values is not None:
+            condition(column, values)
+    join = ''
+    if team is not None or offense is not None:
+        join = ' JOIN games g ON g.season IS p.season AND g.week IS p.week AND g.game_id = p.game_id'
+    if team is not None:
+        teams = team if isinstance(team, (list, tuple, set)) else [team]
+        marks = ', '.join('?' for _ in teams)
+        conditions.append(f'(g.away_team IN ({marks}) OR g.home_team IN ({marks}))')
+        params.extend(list(teams) * 2)
+    if offense is not None:
+        teams = offense if isinstance(offense, (list, tuple, set)) else [offense]
+        marks = ', '.join('?' for _ in teams)
+        conditions.append(f"((p.possession = 'away' AND g.away_team IN ({marks})) OR (p.possession = 'home' AND g.home_team IN ({marks})))")
+        params.extend(list(teams) * 2)
+
+    selected = ', '.join(f'p.{_quote(column)}' for column in PARTITION_COLUMNS + (columns or TABLES['plays']))
+    sql = f'SELECT {selected} FROM plays p{join}'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    return query(path, sql, params)
@@ -0,0 +1,244 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+import numpy as np
+
+# requests is imported when the first session is opened, like in scraping_functions
+
+# statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# (connect, read) timeouts of every request, in seconds
+DEFAULT_TIMEOUT = (5, 30)
+# latencies kept for the statistics of a client
+LATENCY_WINDOW = 10_000
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def retry_after(value, now=None):
+    """
+    Parse a Retry-After header into seconds to wait.
+
+    Parameters
+    ----------
+    value : str or None
+        The header, either a number of seconds or an HTTP date.
+    now : float, optional
+        Current time as a Unix timestamp. Default is None, meaning `time.time()`.
+
+    Returns
+    -------
+    float or None
+        The seconds to wait, never negative, or None if the header is missing or invalid.
+
+    Example
+    -------
+    >>> retry_after('120')
+    120.0
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - (time.time() if now is None else now))
+
+
+def backoff_delay(attempt, backoff=1.0, max_backoff=60.0):
+    """
+    Draw the wait before a retry, with full jitter: uniform between 0 and `backoff` * 2 ** `attempt`,
+    capped at `max_backoff`.
+
+    Jitter keeps the threads of a scrape from retrying in lockstep after a shared failure.
+    """
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client with a keep-alive connection pool, bounded retries and latency statistics.
+
+    Parameters
+    ----------
+    timeout : float or tuple, optional
+        Connect and read timeouts of every request in seconds, see `requests.get`. Default is
+        `DEFAULT_TIMEOUT`.
+    retries : int, optional
+        Number of retries of a request failing with one of the `RETRY_STATUSES`, a connection
+        error, a timeout, a connection dropped in the middle of the body or a body that does not
+        decompress. Default is 3.
+    backoff : float, optional
+        Base of the exponential backoff between retries, in seconds. Default is 1.0.
+    max_backoff : float, optional
+        Longest wait before a retry, in seconds. A Retry-After header asking for longer stops the
+        retries, so a blocked client fails fast instead of sleeping for an hour. Default is 60.0.
+    pool_size : int, optional
+        Number of connections kept alive per host, one per fetching thread. Default is 10.
+    headers : dict, optional
+        Headers added to every request. Default is None.
+
+    Notes
+    -----
+    The `requests.Session` is opened on the first request, so a client costs nothing in offline
+    runs. Responses are accepted gzip or deflate compressed, and brotli compressed when the
+    brotli package is installed, and decompressed transparently. Each retry waits for the
+    Retry-After header of the response if there is one, otherwise for `backoff_delay`, and
+    acquires a new token from the rate limiter, so retries never exceed the request rate.
+
+    Example
+    -------
+    >>> with HttpClient(timeout=10, retries=5) as client:
+    ...     html = client.get('https://www.pro-football-reference.com/boxscores/202309070kan.htm')
+    ...     client.stats()['latency_p50']
+    0.412
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=3, backoff=1.0, max_backoff=60.0, pool_size=10, headers=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.headers = dict(headers or {})
+        self._session = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {'requests': 0, 'retries': 0, 'failures': 0, 'bytes': 0}
+
+    def _open(self):
+        """
+        Return the session, opening it on first use.
+        """
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(self.headers)
+                self._session = session
+            return self._session
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, increment in increments.items():
+                self._counts[name] += increment
+
+    def get(self, url, rate_limiter=None):
+        """
+        Request a page and return its decoded text.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the page.
+        rate_limiter : scraping_functions.RateLimiter, optional
+            Limiter to acquire a token from before every attempt. Default is None.
+
+        Returns
+        -------
+        str
+            The text of the page.
+
+        Raises
+        ------
+        requests.HTTPError
+            If the response is an error, after the retries for the `RETRY_STATUSES`.
+        requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.ContentDecodingError
+            If the host cannot be reached in time, drops the connection before the end of the
+            body, or sends a body that does not decompress, after the retries.
+        """
+        import requests
+
+        session = self._open()
+        for attempt in range(self.retries + 1):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError):
+                self._count(requests=1)
+                if attempt == self.retries:
+                    self._count(failures=1)
+                    raise
+                wait = backoff_delay(attempt, self.backoff, self.max_backoff)
+            else:
+                with self._lock:
+                    self._latencies.append(time.perf_counter() - start)
+                self._count(requests=1, bytes=len(response.content))
+                if response.status_code not in RETRY_STATUSES:
+                    if not response.ok:
+                        self._count(failures=1)
+                    response.raise_for_status()
+                    return response.text
+                wait = retry_after(response.headers.get('Retry-After'))
+                if attempt == self.retries or (wait is not None and wait > self.max_backoff):
+                    self._count(failures=1)
+                    response.raise_for_status()
+                if wait is None:
+                    wait = backoff_delay(attempt, self.backoff, self.max_backoff)
+            self._count(retries=1)
+            time.sleep(wait)
+
+    def stats(self):
+        """
+        Summarize the requests sent so far.
+
+        Returns
+        -------
+        dict
+            Number of 'requests' (every attempt), 'retries' and 'failures', response 'bytes' after
+            decompression, and the mean, median, 95th percentile and maximum latency of the
+            responses in seconds ('latency_mean', 'latency_p50', 'latency_p95', 'latency_max'),
+            over the last `LATENCY_WINDOW` responses. Latencies are None before any response.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = np.array(self._latencies)
+        if len(latencies):
+            p50, p95 = np.percentile(latencies, [50, 95])
+            latency = {'latency_mean': latencies.mean(), 'latency_p50': p50, 'latency_p95': p95, 'latency_max': latencies.max()}
+        else:
+            latency = dict.fromkeys(['latency_mean', 'latency_p50', 'latency_p95', 'latency_max'])
+        return {**counts, **{name: None if value is None else round(float(value), 4) for name, value in latency.items()}}
+
+    def close(self):
+        """
+        Close the pooled connections. The client opens a new session if it is used again.
+        """
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def default_client():
+    """
+    Return the client shared by the calls to `scraping_functions.fetch_html` that are not given one,
+    created with the default settings on first use.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
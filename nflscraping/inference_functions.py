@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+from nflscraping import cleaning_functions as cf
+from nflscraping import clock_functions as clock
+
+# keys of a game state, named after the columns of the play data
+STATE_KEYS = ['quarter', 'clock', 'down', 'to_go', 'yardline', 'field_side', 'away_score', 'home_score', 'possession']
+# feature layout of the win probability model, frozen at fit time
+STATE_FEATURES = ['minutes_played', 'down', 'to_go', 'yards_to_goal', 'score_diff', 'home_possession']
+
+
+def minutes_played(quarters, clocks):
+    """
+    Calculate the game time played from the quarter and the minutes left on the clock.
+
+    Parameters
+    ----------
+    quarters : array-like
+        Quarter numbers, 5 being overtime.
+    clocks : array-like
+        Minutes left in the period.
+
+    Returns
+    -------
+    numpy.ndarray
+        The minutes of game time played, overtime periods being `clock_functions.OT_MINUTES` long.
+
+    Example
+    -------
+    >>> minutes_played([1, 4, 5], [15, 2.5, 10])
+    array([ 0. , 57.5, 60. ])
+    """
+    quarters = np.asarray(quarters, dtype=float)
+    clocks = np.asarray(clocks, dtype=float)
+    regulation = 4 * clock.REGULATION_MINUTES
+    return np.where(quarters >= 5,
+                    regulation + (quarters - 5) * clock.OT_MINUTES + clock.OT_MINUTES - clocks,
+                    quarters * clock.REGULATION_MINUTES - clocks)
+
+
+def state_features(plays):
+    """
+    Build the game state features of every play with a down.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        Play-by-play data, in the format output by the scraping functions or load_data(name='plays').
+
+    Returns
+    -------
+    tuple
+        (X, keep): a float32 array with the columns in `STATE_FEATURES` and the boolean mask of
+        the plays it describes, those with a down and a team in possession.
+
+    Notes
+    -----
+    The yards to goal and the score difference are seen from the team in possession, like the
+    win label of `cleaning_functions.win_labels`.
+    """
+    down = pd.to_numeric(plays['Down'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    possession = plays['possession'].astype(object).to_numpy()
+    keep = ~np.isnan(down) & pd.notna(possession)
+    plays = plays[keep]
+    down = down[keep]
+    home = possession[keep] == 'home'
+    yardline = pd.to_numeric(plays['yardline'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    own_half = plays['field_side'].astype(object).to_numpy() == possession[keep]
+    away_score = pd.to_numeric(plays['away'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    home_score = pd.to_numeric(plays['home'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    X = np.column_stack([
+        minutes_played(clock.quarter_numbers(plays['Quarter']), clock.parse_clock(plays['Time'])),
+        down,
+        pd.to_numeric(plays['ToGo'], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+        np.where(own_half, 100 - yardline, yardline),
+        np.where(home, home_score - away_score, away_score - home_score),
+        home
+    ])
+    return np.nan_to_num(X).astype(np.float32), keep
+
+
+def _clock_minutes(value):
+    """
+    Convert a game clock reading, 'MM:SS' or minutes, to minutes left in the period.
+    """
+    if isinstance(value, str):
+        minutes, seconds = value.split(':')
+        return int(minutes) + int(seconds) / 60
+    return float(value)
+
+
+def _state_row(state):
+    """
+    Build the feature row of one game state dict, without pandas.
+    """
+    quarter = 5 if state['quarter'] == 'OT' else int(state['quarter'])
+    clock_minutes = _clock_minutes(state['clock'])
+    regulation = 4 * clock.REGULATION_MINUTES
+    if quarter >= 5:
+        played = regulation + (quarter - 5) * clock.OT_MINUTES + clock.OT_MINUTES - clock_minutes
+    else:
+        played = quarter * clock.REGULATION_MINUTES - clock_minutes
+    home = state['possession'] == 'home'
+    yardline = state['yardline']
+    yards_to_goal = 100 - yardline if state['field_side'] == state['possession'] else yardline
+    score_diff = state['home_score'] - state['away_score']
+    return [played, state['down'], state['to_go'], yards_to_goal, score_diff if home else -score_diff, home]
+
+
+class WinProbabilityModel:
+    """
+    Win probability model of a game state, with a frozen feature layout and fast inference.
+
+    Parameters
+    ----------
+    n_estimators : int, optional, default: 400
+        The number of trees in the forest.
+    random_state : int, optional, default: 42
+        Controls the randomness of the estimator.
+    **params
+        Other parameters of the `sklearn.ensemble.RandomForestClassifier`.
+
+    Notes
+    -----
+    A game state is a dict with the keys in `STATE_KEYS`: the quarter (1 to 4, or 5 or 'OT'),
+    the clock ('MM:SS' or minutes left in the quarter), the down and yards to go, the yardline and
+    the half of the field it is in ('home' or 'away'), the score of both teams and the team in
+    possession ('home' or 'away').
+
+    After `fit`, the trees of the forest are packed into flat arrays and `predict_proba` walks all
+    of them at once with numpy, one level per step. A single state is turned into a feature row
+    without pandas, so a call takes a fraction of a millisecond instead of the few milliseconds of
+    `RandomForestClassifier.predict_proba`, and gives the same probabilities. The fitted object
+    can be stored with `joblib.dump`.
+
+    Example
+    -------
+    >>> model = WinProbabilityModel().fit(load_data(name='plays', season=2023))
+    >>> model.predict_proba({'quarter': 4, 'clock': '2:00', 'down': 1, 'to_go': 10, 'yardline': 25,
+    ...                      'field_side': 'away', 'away_score': 10, 'home_score': 20, 'possession': 'home'})
+    0.9325
+    """
+
+    def __init__(self, n_estimators=400, random_state=42, **params):
+        self.params = {'n_estimators': n_estimators, 'random_state': random_state, **params}
+        self.forest = None
+        self.feature_columns = None
+
+    def fit(self, plays):
+        """
+        Train the model on play-by-play data of any number of games, identified by 'game_id'.
+
+        Returns
+        -------
+        WinProbabilityModel
+            The fitted model itself.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+
+        y = cf.win_labels(plays).to_numpy()
+        X, keep = state_features(plays)
+        # plays of tied games have no label
+        labeled = ~np.isnan(y[keep])
+        self.forest = RandomForestClassifier(**self.params).fit(X[labeled], y[keep][labeled])
+        self.feature_columns = list(STATE_FEATURES)
+        self._pack()
+        return self
+
+    def _pack(self):
+        """
+        Concatenate the nodes of every tree into flat arrays indexed by twice the node number, so
+        the child taken at a node is `_child[node + goes_right]`. Leaves never go right and point
+        to themselves, so every root stays on its leaf once reached.
+        """
+        win = list(self.forest.classes_).index(1.0) if 1.0 in self.forest.classes_ else None
+        child, feature, threshold, value, leaf, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in self.forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            children = np.empty(2 * tree.node_count, dtype=np.intp)
+            children[0::2] = 2 * (np.where(is_leaf, nodes, tree.children_left) + offset)
+            children[1::2] = 2 * (np.where(is_leaf, nodes, tree.children_right) + offset)
+            child.append(children)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            counts = tree.value[:, 0, :]
+            value.append(counts[:, win] / counts.sum(axis=1) if win is not None else np.zeros(tree.node_count))
+            leaf.append(is_leaf)
+            roots.append(2 * offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+        self._child = np.concatenate(child)
+        self._feature = np.repeat(np.concatenate(feature), 2)
+        self._threshold = np.repeat(np.concatenate(threshold), 2)
+        self._value = np.repeat(np.concatenate(value), 2)
+        self._leaf = np.repeat(np.concatenate(leaf), 2)
+        self._roots = np.array(roots, dtype=np.intp)
+        self._depth = depth
+
+    def transform(self, states):
+        """
+        Build the feature rows of a game state or a list of game states.
+
+        Returns
+        -------
+        numpy.ndarray
+            A float32 array of shape (number of states, number of features).
+        """
+        if isinstance(states, dict):
+            states = [states]
+        return np.array([_state_row(state) for state in states], dtype=np.float32)
+
+    def predict_proba(self, states):
+        """
+        Predict the probability that the team in possession wins.
+
+        Parameters
+        ----------
+        states : dict or list of dict
+            A game state, or a small batch of them, see the class notes.
+
+        Returns
+        -------
+        float or numpy.ndarray
+            The win probability of the team in possession, or an array of them for a list of states.
+        """
+        if self.forest is None:
+            raise ValueError('The model is not fitted yet. Call fit first.')
+        X = self.transform(states)
+        n_states, n_features = X.shape
+        x = X.ravel()
+        nodes = np.tile(self._roots, n_states)
+        # position of the first feature of the state each node belongs to
+        rows = np.repeat(np.arange(n_states) * n_features, len(self._roots)) if n_states > 1 else 0
+        for step in range(self._depth):
+            goes_right = x.take(self._feature.take(nodes) + rows) > self._threshold.take(nodes)
+            nodes = self._child.take(nodes + goes_right)
+            if step % 4 == 3 and self._leaf.take(nodes).all():
+                break
+        probabilities = self._value.take(nodes).reshape(n_states, -1).mean(axis=1)
+        return float(probabilities[0]) if isinstance(states, dict) else probabilities
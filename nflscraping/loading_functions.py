@@ -1,9 +1,153 @@
+import os
+import re
+from functools import lru_cache
+from importlib import resources
 import pandas as pd
-import pkg_resources
+from nflscraping import writing_functions as wf
 
-def load_data(name = 'games'):
+# bundled data files are named week_<week>_<season>_<name>.csv
+DATA_FILE_PATTERN = re.compile(r'week_(\d+)_(\d+)_(games|plays)\.csv')
+# column types applied while reading the bundled data files
+CSV_DTYPES = wf.PARQUET_DTYPES
+DEFAULT_SEASON = 2023
+DEFAULT_WEEK = 1
+
+
+def _as_list(value):
+    """
+    Wrap a scalar filter value in a list.
+    """
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def _partition_filter(ds, season, week):
+    """
+    Build the pyarrow expression selecting the season and week partitions.
     """
-    Load data from a CSV file.
+    expression = None
+    for field, value in (('season', season), ('week', week)):
+        if value is None:
+            continue
+        condition = ds.field(field).isin(_as_list(value))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def load_store(root, name='plays', season=None, week=None, team=None, quarter=None, columns=None):
+    """
+    Load play or game data from a partitioned parquet store, reading only what is needed.
+
+    Parameters
+    ----------
+    root : str
+        Directory of the store, holding the 'plays', 'drives' and 'games' datasets written by
+        `scraping_functions.scrape_games(..., data_format='parquet', season=..., week=...)`.
+    name : str, optional
+        Either 'plays', 'drives' or 'games'. Default is 'plays'.
+    season : int or list of int, optional
+        Season(s) to load. Default is None, meaning every season.
+    week : int or list of int, optional
+        Week(s) to load. Default is None, meaning every week.
+    team : str or list of str, optional
+        Team abbreviation(s), e.g. 'KAN'. Only games involving these teams are loaded.
+        Default is None.
+    quarter : int or list of int, optional
+        Quarter(s) of the plays or drives to load, 5 being overtime. Ignored for games. Default is None.
+    columns : list of str, optional
+        Columns to load. Default is None, meaning every column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The selected rows and columns, with 'season' and 'week' columns from the partitions.
+
+    Notes
+    -----
+    Season and week filters prune whole partition directories, and the other filters and the
+    column projection are pushed down to the parquet reader, so only the partitions, row groups
+    and columns that are needed are read. A team filter first reads the small games dataset to
+    find the matching games. Requires pyarrow.
+
+    Example
+    -------
+    >>> plays = load_store('store', season=2023, week=[1, 2], team='KAN', quarter=4,
+    ...                    columns=['Down', 'ToGo', 'Play_Type', 'Yardage'])
+    """
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ImportError('Loading a parquet store requires pyarrow. Install it with: pip install pyarrow')
+    if name not in ['plays', 'drives', 'games']:
+        raise NameError(f"{name}-is-not-recognized. -The-only-names-are-'games',-'drives'-and-'plays'.")
+
+    expression = _partition_filter(ds, season, week)
+
+    if team is not None:
+        games = ds.dataset(os.path.join(root, 'games'), format='parquet', partitioning='hive')
+        teams = _as_list(team)
+        team_filter = ds.field('away_team').isin(teams) | ds.field('home_team').isin(teams)
+        if expression is not None:
+            team_filter = expression & team_filter
+        matches = games.to_table(columns=['season', 'week', 'game_id'], filter=team_filter).to_pylist()
+        game_filter = None
+        for match in matches:
+            condition = (ds.field('season') == match['season']) & (ds.field('week') == match['week']) & (ds.field('game_id') == match['game_id'])
+            game_filter = condition if game_filter is None else game_filter | condition
+        if game_filter is None:
+            game_filter = ds.scalar(False)
+        expression = game_filter if expression is None else expression & game_filter
+
+    if quarter is not None and name in ['plays', 'drives']:
+        condition = ds.field('Quarter').isin(_as_list(quarter))
+        expression = condition if expression is None else expression & condition
+
+    dataset = ds.dataset(os.path.join(root, name), format='parquet', partitioning='hive')
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def available_weeks(name='plays'):
+    """
+    List the weeks of data bundled with the package.
+
+    Parameters
+    ----------
+    name : str, optional
+        Either 'games' or 'plays'. Default is 'plays'.
+
+    Returns
+    -------
+    list of tuple
+        Sorted (season, week) pairs for which a data file exists.
+
+    Example
+    -------
+    >>> available_weeks()
+    [(2023, 1), (2023, 10)]
+    """
+    weeks = []
+    for entry in resources.files('nflscraping').joinpath('data').iterdir():
+        match = DATA_FILE_PATTERN.fullmatch(entry.name)
+        if match and match.group(3) == name:
+            weeks.append((int(match.group(2)), int(match.group(1))))
+    return sorted(weeks)
+
+
+@lru_cache(maxsize=16)
+def _read_bundled(name, season, week):
+    """
+    Read a bundled data file with the explicit column types. Results are memoized, so callers
+    must copy the returned frame before changing it.
+    """
+    data_file = resources.files('nflscraping').joinpath('data', f'week_{week}_{season}_{name}.csv')
+    with data_file.open('r', encoding='utf-8') as f:
+        return pd.read_csv(f, dtype=CSV_DTYPES)
+
+
+def load_data(name = 'games', root=None, season=None, week=None, team=None, quarter=None, columns=None):
+    """
+    Load data bundled with the package, or from a partitioned parquet store.
 
     Parameters
     ----------
@@ -11,29 +155,73 @@ def load_data(name = 'games'):
         Specifies the type of data to load. Default is 'games'.
         If 'games', the function loads game data.
         If 'plays', the function loads play data.
+        If 'drives', the function loads drive data, only available with `root`.
+    root : str, optional
+        Directory of a parquet store written by the scraping functions. Default is None,
+        meaning the data bundled with the package is loaded.
+    season : int or list of int, optional
+        Season(s) to load. Default is None.
+    week : int or list of int, optional
+        Week(s) to load. Default is None. When neither `season` nor `week` is given, the
+        bundled week 1 of 2023 is loaded; otherwise every matching week listed by
+        `available_weeks` is loaded, with 'season' and 'week' columns added.
+    team : str or list of str, optional
+        Team abbreviation(s) of the games to load. Only supported with `root`.
+    quarter : int or list of int, optional
+        Quarter(s) of the plays to load, 5 being overtime. Default is None.
+    columns : list of str, optional
+        Columns to load. Default is None, meaning every column.
 
     Returns
     -------
     pandas.DataFrame
-        A DataFrame containing the loaded data.
+        A DataFrame containing the loaded data, typed with the compact schema of
+        `writing_functions.PLAY_DTYPES` (small integers, float32, categories and strings) so
+        callers do not need to recast it.
 
     Raises
     ------
     NameError
         If the provided `name` is not recognized. The only valid names
         are 'games' and 'plays'.
+    ValueError
+        If no bundled data matches `season` and `week`.
+
+    Notes
+    -----
+    Bundled files are found with `importlib.resources` and memoized in-process (least recently
+    used, up to 16 files), so repeated calls return a copy without parsing the CSV again.
+    With `root`, the filters are pushed down to the parquet reader, see `load_store`.
 
     Example
     -------
     >>> games_data = load_data()  # Load game data by default
     >>> plays_data = load_data(name='plays')  # Load play data explicitly
+    >>> week_10_plays = load_data(name='plays', season=2023, week=10)
+    >>> kan_plays = load_data(name='plays', root='store', season=2023, team='KAN')
+    >>> kan_drives = load_data(name='drives', root='store', season=2023, team='KAN')
     """
-    if name == 'games':
-        path = 'data/week_1_2023_games.csv'
-    elif name == 'plays':
-        path = 'data/week_1_2023_plays.csv'
+    if root is not None:
+        return load_store(root, name, season=season, week=week, team=team, quarter=quarter, columns=columns)
+    if name not in ['games', 'plays']:
+        raise NameError(f"{name}-is-not-recognized. -The-only-names-are-'games'-and-'plays'.")
+    if team is not None:
+        raise ValueError('Filtering by team is only supported when loading a store with root.')
+
+    if season is None and week is None:
+        data = _read_bundled(name, DEFAULT_SEASON, DEFAULT_WEEK).copy()
     else:
-        raise NameError(f"{name}-is-not-recognized. -The-only-names-are-'games'-and-'data'.")
-    
-    data_path = pkg_resources.resource_filename('mypackage', path)
-    return pd.read_csv(data_path)
\ No newline at end of file
+        seasons = None if season is None else _as_list(season)
+        weeks = None if week is None else _as_list(week)
+        selected = [(s, w) for s, w in available_weeks(name)
+                    if (seasons is None or s in seasons) and (weeks is None or w in weeks)]
+        if not selected:
+            raise ValueError(f'No bundled {name} data for season {season}, week {week}. Available weeks are {available_weeks(name)}.')
+        frames = [_read_bundled(name, s, w).assign(season=s, week=w) for s, w in selected]
+        data = pd.concat(frames, ignore_index=True)
+
+    if quarter is not None and name == 'plays':
+        data = data[data['Quarter'].isin(_as_list(quarter))]
+    if columns is not None:
+        data = data[columns]
+    return data
@@ -0,0 +1,173 @@
+import json
+import os
+from nflscraping import caching_functions as cache
+
+STATUSES = ['pending', 'completed', 'failed']
+
+
+def load_manifest(path):
+    """
+    Load a scraping manifest from disk.
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON manifest.
+
+    Returns
+    -------
+    manifest : dict
+        Maps each game URL to a dict with keys 'game_id' (int), 'status' (one of `STATUSES`)
+        and 'error' (message of the last failure, or None), and for completed games
+        'positions', the positions of the outputs once the game was written, see
+        `resume_positions`. An empty dict if the file does not exist yet.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    """
+    Write a scraping manifest to disk atomically.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest, as returned by `load_manifest`.
+    path : str
+        Path of the JSON manifest.
+
+    Notes
+    -----
+    The manifest is written to a temporary file that then replaces `path`, so a crash never
+    leaves a truncated manifest behind.
+    """
+    cache.write_atomic(path, json.dumps(manifest, indent=1).encode('utf-8'))
+
+
+def add_games(manifest, game_links):
+    """
+    Register game URLs in a manifest as pending games.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest, updated in place.
+    game_links : list of str
+        Game URLs to register. URLs already in the manifest keep their game id and status.
+
+    Returns
+    -------
+    manifest : dict
+        The updated manifest. New games get the next free game ids, in the order of `game_links`.
+
+    Example
+    -------
+    >>> add_games({}, ['https://.../202309070kan.htm', 'https://.../202309100atl.htm'])
+    {'https://.../202309070kan.htm': {'game_id': 1, 'status': 'pending', 'error': None}, ...}
+    """
+    next_id = max((game['game_id'] for game in manifest.values()), default=0) + 1
+    for link in game_links:
+        if link not in manifest:
+            manifest[link] = {'game_id': next_id, 'status': 'pending', 'error': None}
+            next_id += 1
+    return manifest
+
+
+def games_to_scrape(manifest):
+    """
+    List the games of a manifest that still have to be scraped.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest.
+
+    Returns
+    -------
+    list of tuple
+        (game_id, link) pairs of the pending and failed games, sorted by game id.
+    """
+    return sorted((game['game_id'], link) for link, game in manifest.items() if game['status'] != 'completed')
+
+
+def mark_game(manifest, link, status, error=None, positions=None):
+    """
+    Set the status of a game in a manifest.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest, updated in place.
+    link : str
+        URL of the game.
+    status : str
+        New status, one of `STATUSES`.
+    error : str, optional
+        Message describing a failure. Default is None.
+    positions : dict, optional
+        Position of every output once the game was written, keyed by output name, e.g.
+        {'plays': 48213, 'games': 512}. Default is None, meaning no positions are recorded.
+
+    Raises
+    ------
+    ValueError
+        If `status` is not one of `STATUSES`.
+    """
+    if status not in STATUSES:
+        raise ValueError(f'{status} is not a recognized status. The only statuses are {STATUSES}.')
+    manifest[link]['status'] = status
+    manifest[link]['error'] = error
+    if positions is not None:
+        manifest[link]['positions'] = positions
+
+
+def resume_positions(manifest):
+    """
+    Find the point every output has to be cut back to before a run resumes.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest.
+
+    Returns
+    -------
+    dict or None
+        The furthest position of every output over the completed games, i.e. the end of the
+        last game the manifest knows was fully written. Anything after it belongs to a game that
+        is scraped again. None if no completed game has positions.
+
+    Example
+    -------
+    >>> resume_positions({'https://.../202309070kan.htm': {'game_id': 1, 'status': 'completed', 'error': None,
+    ...                                                   'positions': {'plays': 15872, 'games': 143}}})
+    {'plays': 15872, 'games': 143}
+    """
+    recorded = [game['positions'] for game in manifest.values() if game['status'] == 'completed' and game.get('positions')]
+    if not recorded:
+        return None
+    names = {name for positions in recorded for name in positions}
+    return {name: max(positions[name] for positions in recorded if name in positions) for name in sorted(names)}
+
+
+def summarize_manifest(manifest):
+    """
+    Count the games of a manifest by status.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest.
+
+    Returns
+    -------
+    dict
+        Number of games for each status in `STATUSES`.
+    """
+    counts = {status: 0 for status in STATUSES}
+    for game in manifest.values():
+        counts[game['status']] += 1
+    return counts
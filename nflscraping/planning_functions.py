@@ -0,0 +1,238 @@
+import os
+import re
+import time
+from nflscraping import scraping_functions as sf
+from nflscraping import fetching_functions as fetch
+from nflscraping import manifest_functions as mf
+
+BASE_URL = 'https://www.pro-football-reference.com'
+SCHEDULE_URL = BASE_URL + '/years/{season}/week_{week}.htm'
+BOXSCORE_PATTERN = re.compile(r'^(?:https?://www\.pro-football-reference\.com)?/boxscores/[0-9]{9}[a-z]{3}\.htm$')
+# subdirectory of the HTML cache holding the schedule pages, kept apart from the boxscore pages so
+# rebuilding every cached game does not pick them up
+SCHEDULE_CACHE_DIR = 'schedules'
+
+
+def schedule_url(season, week):
+    """
+    Build the URL of the Pro Football Reference schedule page of a week.
+
+    Parameters
+    ----------
+    season : int
+        The season, e.g. 2023.
+    week : int
+        The week of the season.
+
+    Returns
+    -------
+    str
+        The URL of the week's schedule page.
+
+    Example
+    -------
+    >>> schedule_url(2023, 1)
+    'https://www.pro-football-reference.com/years/2023/week_1.htm'
+    """
+    return SCHEDULE_URL.format(season=season, week=week)
+
+
+def parse_schedule(html):
+    """
+    Extract the boxscore links from the HTML of a schedule page.
+
+    Parameters
+    ----------
+    html : str
+        The raw HTML of a Pro Football Reference week schedule page.
+
+    Returns
+    -------
+    list of str
+        Absolute boxscore URLs, in page order and without duplicates. Games that have not been
+        played yet have no boxscore link and are left out.
+
+    Example
+    -------
+    >>> with open('week_1.htm') as f:
+    ...     links = parse_schedule(f.read())
+    >>> links[0]
+    'https://www.pro-football-reference.com/boxscores/202309070kan.htm'
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    anchors = BeautifulSoup(html, sf.PARSER, parse_only=SoupStrainer('a', href=BOXSCORE_PATTERN))
+    links = []
+    for anchor in anchors.find_all('a'):
+        link = anchor['href']
+        if link.startswith('/'):
+            link = BASE_URL + link
+        if link not in links:
+            links.append(link)
+    return links
+
+
+def plan_backfill(season, weeks, cache_dir, offline=False, rate_limiter=None, client=None):
+    """
+    Build the work queue of boxscore URLs for a range of weeks.
+
+    Parameters
+    ----------
+    season : int or list of int
+        Season(s) to backfill.
+    weeks : iterable of int
+        Weeks of each season to backfill, e.g. range(1, 19).
+    cache_dir : str
+        Directory of the raw HTML cache. Schedule pages are cached in its `SCHEDULE_CACHE_DIR`
+        subdirectory, so `caching_functions.cached_links(cache_dir)` only lists boxscore pages.
+    offline : bool, optional
+        If True, schedule pages are only read from the cache. Default is False.
+    rate_limiter : scraping_functions.RateLimiter, optional
+        Limiter for schedule pages that are not cached. Default is None, meaning a new
+        limiter allowing one request every 10 seconds.
+    client : fetching_functions.HttpClient, optional
+        Client fetching schedule pages that are not cached. Default is None, meaning the shared
+        client of `scraping_functions.fetch_html`.
+
+    Returns
+    -------
+    queue : list of tuple
+        (season, week, link) for every boxscore found, in season, week and page order.
+
+    Example
+    -------
+    >>> queue = plan_backfill(2023, range(1, 19), cache_dir='html_cache')
+    >>> len(queue)
+    272
+    """
+    seasons = season if isinstance(season, (list, tuple, range)) else [season]
+    if rate_limiter is None:
+        rate_limiter = sf.RateLimiter()
+    schedule_cache_dir = os.path.join(cache_dir, SCHEDULE_CACHE_DIR)
+    queue = []
+    for s in seasons:
+        for week in weeks:
+            html = sf.fetch_html(schedule_url(s, week), rate_limiter=rate_limiter, cache_dir=schedule_cache_dir,
+                                 offline=offline, client=client)
+            queue.extend((s, week, link) for link in parse_schedule(html))
+    return queue
+
+
+def estimate_eta(games_done, games_total, elapsed):
+    """
+    Estimate the throughput and the remaining time of a backfill.
+
+    Parameters
+    ----------
+    games_done : int
+        Number of games processed so far.
+    games_total : int
+        Total number of games in the backfill.
+    elapsed : float
+        Seconds since the backfill started.
+
+    Returns
+    -------
+    tuple
+        (games per minute, estimated seconds left). Both are None before the first game is done.
+
+    Example
+    -------
+    >>> estimate_eta(16, 272, 240.0)
+    (4.0, 3840.0)
+    """
+    if games_done == 0 or elapsed <= 0:
+        return None, None
+    rate = games_done / elapsed
+    return rate * 60, (games_total - games_done) / rate
+
+
+def _completed_games(manifest_path):
+    """
+    Count the completed games of a manifest, 0 if it does not exist yet.
+    """
+    return mf.summarize_manifest(mf.load_manifest(manifest_path))['completed']
+
+
+def run_backfill(season, weeks, store_root, cache_dir, batch_size=16, workers=1, requests_per_second=0.1, offline=False, processes=0):
+    """
+    Scrape every game of a range of weeks into a partitioned parquet store.
+
+    Parameters
+    ----------
+    season : int or list of int
+        Season(s) to backfill.
+    weeks : iterable of int
+        Weeks of each season to backfill.
+    store_root : str
+        Directory of the store. Plays, drives and games are written to its 'plays', 'drives' and 'games' datasets,
+        partitioned by season and week, and checkpoint manifests to its 'manifests' directory.
+    cache_dir : str
+        Directory of the raw HTML cache, used for boxscore pages, and for schedule pages in its
+        `SCHEDULE_CACHE_DIR` subdirectory.
+    batch_size : int, optional
+        Number of games handed to `scraping_functions.scrape_games` at a time. Default is 16.
+    workers : int, optional
+        Number of games scraped concurrently. Default is 1.
+    requests_per_second : float, optional
+        Maximum request rate to the host. Default is 0.1.
+    offline : bool, optional
+        If True, every page is read from the cache. Default is False.
+    processes : int, optional
+        Number of worker processes parsing and cleaning pages, see `scraping_functions.scrape_games`.
+        Default is 0.
+
+    Returns
+    -------
+    dict
+        Number of games planned, skipped as already completed by an earlier run, and processed
+        by this run, the elapsed seconds, and the request statistics of the run under 'fetch',
+        see `fetching_functions.HttpClient.stats`.
+
+    Notes
+    -----
+    The work queue comes from `plan_backfill`. One rate limiter and one HTTP client are shared by the
+    schedule pages and every batch, so batch boundaries neither burst requests nor drop the pooled
+    connections. Each week keeps a checkpoint manifest, so running
+    the same backfill again skips the games already done and retries the failed ones. The
+    throughput and the estimated time left are printed after every batch, counting only the games
+    this run completes, so a resumed backfill does not report the skipped games as progress.
+
+    Example
+    -------
+    >>> run_backfill(2023, range(1, 19), 'store', 'html_cache', workers=4, requests_per_second=0.5)
+    >>> plays = loading_functions.load_data(name='plays', root='store', season=2023)
+    """
+    rate_limiter = sf.RateLimiter(rate=requests_per_second)
+    with fetch.HttpClient(pool_size=workers) as client:
+        queue = plan_backfill(season, weeks, cache_dir, offline=offline, rate_limiter=rate_limiter, client=client)
+        partitions = {}
+        for s, week, link in queue:
+            partitions.setdefault((s, week), []).append(link)
+
+        manifest_dir = os.path.join(store_root, 'manifests')
+        os.makedirs(manifest_dir, exist_ok=True)
+        manifest_paths = {(s, week): os.path.join(manifest_dir, f'season_{s}_week_{week}.json') for s, week in partitions}
+        games_skipped = 0
+        for key, links in partitions.items():
+            manifest = mf.load_manifest(manifest_paths[key])
+            games_skipped += sum(manifest.get(link, {}).get('status') == 'completed' for link in links)
+        games_total = len(queue) - games_skipped
+        start = time.time()
+        games_done = 0
+        for (s, week), links in partitions.items():
+            manifest_path = manifest_paths[(s, week)]
+            for i in range(0, len(links), batch_size):
+                batch = links[i:i + batch_size]
+                completed = _completed_games(manifest_path)
+                sf.scrape_games(batch, os.path.join(store_root, 'plays'), os.path.join(store_root, 'games'),
+                                workers=workers, requests_per_second=requests_per_second, cache_dir=cache_dir,
+                                offline=offline, data_format='parquet', season=s, week=week, manifest_path=manifest_path,
+                                rate_limiter=rate_limiter, processes=processes,
+                                drive_file_path=os.path.join(store_root, 'drives'), client=client)
+                games_done += _completed_games(manifest_path) - completed
+                rate, eta = estimate_eta(games_done, games_total, time.time() - start)
+                if rate is not None:
+                    print(f'season {s} week {week}: {games_done}/{games_total} games, {rate:.1f} games/min, ETA {eta / 60:.1f} min')
+    return {'games_planned': len(queue), 'games_skipped': games_skipped, 'games_processed': games_done,
+            'elapsed': time.time() - start, 'fetch': client.stats()}
@@ -1,16 +1,431 @@
-import sklearn
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, roc_curve, auc
+import copy
+import hashlib
+import json
+import os
+import time
 import pandas as pd 
 import numpy as np
 from nflscraping import cleaning_functions as cf
-from nflscraping import scraping_functions as sf
-import seaborn as sns
-import matplotlib.pyplot as plt
+from nflscraping import caching_functions as cache
 
+# scikit-learn, joblib and matplotlib are imported by the functions using them, so importing this
+# module stays cheap for code that only builds features
 
-def predict_wins(test_data, train_data, n_estimators=400, random_state=42):
+# categories of the dummy-encoded features, fixed so every feature matrix has the same layout
+PLAY_TYPES = cf.PLAY_TYPES
+DOWNS = [1, 2, 3, 4]
+SIDES = ['away', 'home']
+NUMERIC_FEATURES = ['ToGo', 'EPB', 'EPA', 'yardline', 'Yardage', 'seconds_left', 'score_diff', 'adjusted_score']
+CATEGORICAL_FEATURES = {
+    'Play_Type': PLAY_TYPES,
+    'Down': DOWNS,
+    'field_side': SIDES,
+    'possession': SIDES
+}
+FEATURE_COLUMNS = NUMERIC_FEATURES + [f'{column}_{category}' for column, categories in CATEGORICAL_FEATURES.items() for category in categories]
+# version of the feature pipeline, part of the key of cached models; bump it whenever a change
+# to build_features gives different features for the same plays
+FEATURE_VERSION = 2
+
+
+def build_features(plays):
+    """
+    Build the model matrix and the win labels of the random forest from play-by-play data.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        Play-by-play data of any number of games, in the format output by the scraping functions
+        scrape_game_data or scrape_games (or load_data(name='plays')).
+
+    Returns
+    -------
+    tuple
+        A tuple (X, y) where X is a DataFrame with the columns in `FEATURE_COLUMNS`, one row per
+        play with a down of a game with a winner, and y is a Series with 1.0 where the team in
+        possession wins the game.
+
+    Notes
+    -----
+    - All features are computed with whole-column operations, so the same function prepares the
+      training and the test data.
+    - The win label and the yardage are computed per 'game_id', or over the whole frame as a
+      single game when there is no such column, before plays without a down (kickoffs, extra
+      points, ...) and plays of tied games, which `cleaning_functions.win_labels` leaves
+      unlabeled, are dropped.
+    - 'Play_Type' and 'Yardage' are recomputed from the play descriptions with
+      `cleaning_functions.classify_plays` and `cleaning_functions.yards_gained`, so data
+      scraped with the older Pass/Run/Special Teams labels gets the same features.
+    - Categorical columns are one-hot encoded against fixed categories, so the column layout does
+      not depend on which values appear in `plays`. Missing values are filled with 0.
+
+    Example
+    -------
+    >>> X_train, y_train = build_features(load_data(name='plays'))
+    """
+    y = cf.win_labels(plays)
+    plays = plays.assign(Play_Type=cf.classify_plays(plays['Detail']))
+    # a single scraped game has no 'game_id' column, like in win_labels
+    by = 'game_id' if 'game_id' in plays.columns else None
+    plays = plays.assign(Yardage=pd.Series(cf.yards_gained(plays, by=by), index=plays.index))
+    down = pd.to_numeric(plays['Down'], errors='coerce')
+    has_down = down.notna() & y.notna()
+    plays = plays[has_down]
+    y = y[has_down]
+
+    features = pd.DataFrame(index=plays.index)
+    for column in ['ToGo', 'EPB', 'EPA', 'yardline', 'Yardage']:
+        features[column] = pd.to_numeric(plays[column], errors='coerce').astype(float)
+    features['seconds_left'] = cf.seconds_left(plays).astype(float)
+    features['score_diff'] = plays['away'].astype(float) - plays['home'].astype(float)
+    features['adjusted_score'] = cf.adjusted_score_calc(features)
+
+    categorical = {
+        'Play_Type': plays['Play_Type'],
+        'Down': down[has_down].astype(int),
+        'field_side': plays['field_side'],
+        'possession': plays['possession']
+    }
+    for column, categories in CATEGORICAL_FEATURES.items():
+        codes = pd.Categorical(categorical[column], categories=categories).codes
+        for i, category in enumerate(categories):
+            features[f'{column}_{category}'] = (codes == i).astype(np.uint8)
+
+    return features.fillna(0), y
+
+
+def model_cache_key(X, y, params):
+    """
+    Compute the key of a model trained on a feature matrix with given hyperparameters.
+
+    Parameters
+    ----------
+    X : pandas.DataFrame
+        Feature matrix, as returned by `build_features`.
+    y : pandas.Series
+        Win labels, as returned by `build_features`.
+    params : dict
+        Hyperparameters of the classifier.
+
+    Returns
+    -------
+    str
+        The hex SHA-256 digest of the features, labels, hyperparameters, `FEATURE_COLUMNS` and
+        `FEATURE_VERSION`.
+    """
+    import sklearn
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'feature_version': FEATURE_VERSION, 'columns': list(X.columns),
+                              'sklearn': sklearn.__version__, 'params': params}, sort_keys=True).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def model_path(key, model_dir):
+    """
+    Return the path of a cached model.
+    """
+    return os.path.join(model_dir, key + '.joblib')
+
+
+def load_model(key, model_dir):
+    """
+    Load a model from the model cache.
+
+    Parameters
+    ----------
+    key : str
+        Key of the model, see `model_cache_key`.
+    model_dir : str
+        Directory of the model cache.
+
+    Returns
+    -------
+    sklearn.ensemble.RandomForestClassifier or None
+        The fitted model, or None if it is not cached.
+    """
+    import joblib
+
+    try:
+        return joblib.load(model_path(key, model_dir))
+    except FileNotFoundError:
+        return None
+
+
+def save_model(model, key, model_dir):
+    """
+    Store a fitted model in the model cache.
+
+    Parameters
+    ----------
+    model : sklearn.ensemble.RandomForestClassifier
+        The fitted model.
+    key : str
+        Key of the model, see `model_cache_key`.
+    model_dir : str
+        Directory of the model cache. Created if it does not exist.
+
+    Returns
+    -------
+    str
+        The path of the cached model, written atomically so concurrent readers never load a
+        partial file.
+    """
+    import joblib
+
+    os.makedirs(model_dir, exist_ok=True)
+    path = model_path(key, model_dir)
+    with cache.atomic_path(path) as tmp_path:
+        joblib.dump(model, tmp_path)
+    return path
+
+
+def fit_model(train_data, n_estimators=400, random_state=42, model_dir=None):
+    """
+    Train the win model on play-by-play data, or load it from the model cache.
+
+    Parameters
+    ----------
+    train_data : pandas.DataFrame
+        Play-by-play data, in the format accepted by `build_features`.
+    n_estimators : int, optional, default: 400
+        The number of trees in the forest.
+    random_state : int, optional, default: 42
+        Controls the randomness of the estimator.
+    model_dir : str, optional
+        Directory of the model cache. Default is None, meaning the model is always trained and
+        not stored.
+
+    Returns
+    -------
+    tuple
+        (model, key): the fitted RandomForestClassifier and its key in the model cache.
+
+    Notes
+    -----
+    The key is computed by `model_cache_key` from the training features rather than from
+    `train_data`, so columns the model does not use do not invalidate cached models.
+
+    Example
+    -------
+    >>> model, key = fit_model(load_data(name='plays', season=2023), model_dir='models')
+    >>> accuracy, post_data = predict_wins(test_data, model_dir='models', model_key=key)
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_train, y_train = build_features(train_data)
+    params = {'n_estimators': n_estimators, 'random_state': random_state}
+    key = model_cache_key(X_train, y_train, params)
+    model = load_model(key, model_dir) if model_dir is not None else None
+    if model is None:
+        model = RandomForestClassifier(**params)
+        model.fit(X_train, y_train)
+        if model_dir is not None:
+            save_model(model, key, model_dir)
+    return model, key
+
+
+def update_model(model, new_data, n_estimators=100, model_dir=None, key=None):
+    """
+    Fold new plays into a trained win model by adding trees fitted on them only.
+
+    Parameters
+    ----------
+    model : sklearn.ensemble.RandomForestClassifier
+        The fitted model, e.g. from `fit_model`. It is not modified.
+    new_data : pandas.DataFrame
+        Play-by-play data of the new games only, in the format accepted by `build_features`.
+    n_estimators : int, optional, default: 100
+        The number of trees added to the forest.
+    model_dir : str, optional
+        Directory of the model cache. Used together with `key`. Default is None.
+    key : str, optional
+        Key of `model` in the model cache. The updated model is then cached under a key derived
+        from it and from the new plays. Default is None, meaning nothing is cached.
+
+    Returns
+    -------
+    tuple
+        (model, key): the updated RandomForestClassifier and its key in the model cache, or
+        None if `key` is not given.
+
+    Notes
+    -----
+    The new trees are grown with the forest's `warm_start`, so only the features of the new
+    plays are built and the earlier trees are kept as they are. The earlier seasons are not
+    reprocessed, but the trees fitted on them never see the new games, so the model drifts from a
+    full refit as updates pile up; `drift_report` measures by how much.
+
+    Example
+    -------
+    >>> model, key = fit_model(history, model_dir='models')
+    >>> model, key = update_model(model, this_week, model_dir='models', key=key)
+    """
+    X_new, y_new = build_features(new_data)
+    if key is not None:
+        key = hashlib.sha256((key + model_cache_key(X_new, y_new, {'warm_start_trees': n_estimators})).encode('utf-8')).hexdigest()
+        cached = load_model(key, model_dir) if model_dir is not None else None
+        if cached is not None:
+            return cached, key
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_estimators)
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False)
+    if key is not None and model_dir is not None:
+        save_model(model, key, model_dir)
+    return model, key
+
+
+def evaluate_model(model, test_data):
+    """
+    Score a trained win model on play-by-play data.
+
+    Parameters
+    ----------
+    model : sklearn.ensemble.RandomForestClassifier
+        The fitted model.
+    test_data : pandas.DataFrame
+        Play-by-play data, in the format accepted by `build_features`.
+
+    Returns
+    -------
+    dict
+        'accuracy' of the predicted labels and 'auc', the area under the ROC curve of the
+        predicted win probabilities, or None if `test_data` holds a single class.
+    """
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    X, y = build_features(test_data)
+    probabilities = model.predict_proba(X)[:, list(model.classes_).index(1.0)]
+    return {'accuracy': accuracy_score(y, model.predict(X)),
+            'auc': roc_auc_score(y, probabilities) if y.nunique() == 2 else None}
+
+
+def _stack_plays(frames):
+    """
+    Concatenate play data of several frames, renumbering 'game_id' so games of different frames
+    never share an id.
+    """
+    stacked = []
+    offset = 0
+    for frame in frames:
+        ids = frame.groupby('game_id', sort=False).ngroup()
+        stacked.append(frame.assign(game_id=ids + offset))
+        offset += ids.max() + 1
+    return pd.concat(stacked, ignore_index=True)
+
+
+def drift_report(train_data, new_data, test_data, n_estimators=400, n_new_estimators=100, random_state=42, model_dir=None):
+    """
+    Compare an incrementally updated win model with a full refit on the same plays.
+
+    Parameters
+    ----------
+    train_data : pandas.DataFrame
+        Play-by-play data the current model is trained on.
+    new_data : pandas.DataFrame
+        Play-by-play data of the new games.
+    test_data : pandas.DataFrame
+        Play-by-play data both models are scored on, e.g. the following week.
+    n_estimators : int, optional, default: 400
+        The number of trees of the current model and of the full refit.
+    n_new_estimators : int, optional, default: 100
+        The number of trees `update_model` adds for the new games.
+    random_state : int, optional, default: 42
+        Controls the randomness of the estimators.
+    model_dir : str, optional
+        Directory of the model cache used for the current model. Default is None.
+
+    Returns
+    -------
+    dict
+        'incremental' and 'full_refit' hold the 'accuracy', 'auc', 'n_estimators' and
+        'fit_seconds' of each model, and 'accuracy_drift' and 'auc_drift' the incremental score
+        minus the full refit score. Games of the three frames are matched by 'game_id' within
+        each frame only.
+
+    Example
+    -------
+    >>> report = drift_report(load_data(name='plays', season=2023, week=1),
+    ...                       load_data(name='plays', season=2023, week=10), next_week)
+    >>> report['auc_drift']
+    -0.004
+    """
+    model, key = fit_model(train_data, n_estimators, random_state, model_dir)
+    start = time.perf_counter()
+    incremental, _ = update_model(model, new_data, n_new_estimators)
+    incremental_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    full, _ = fit_model(_stack_plays([train_data, new_data]), n_estimators, random_state)
+    full_seconds = time.perf_counter() - start
+
+    report = {
+        'incremental': {**evaluate_model(incremental, test_data), 'n_estimators': len(incremental.estimators_),
+                        'fit_seconds': incremental_seconds},
+        'full_refit': {**evaluate_model(full, test_data), 'n_estimators': len(full.estimators_),
+                       'fit_seconds': full_seconds}
+    }
+    report['accuracy_drift'] = report['incremental']['accuracy'] - report['full_refit']['accuracy']
+    if report['incremental']['auc'] is None:
+        report['auc_drift'] = None
+        print(f"accuracy drift: {report['accuracy_drift']:+.4f}")
+    else:
+        report['auc_drift'] = report['incremental']['auc'] - report['full_refit']['auc']
+        print(f"accuracy drift: {report['accuracy_drift']:+.4f}, AUC drift: {report['auc_drift']:+.4f}")
+    return report
+
+
+def _draw_roc(ax, y, y_score):
+    """
+    Draw the ROC curve of win predictions on matplotlib axes.
+    """
+    from sklearn.metrics import roc_curve, auc
+
+    fpr, tpr, _ = roc_curve(y, y_score)
+    roc_auc = auc(fpr, tpr)
+    ax.plot(fpr, tpr, color='darkorange', lw=2, label='ROC curve (area = {:.2f})'.format(roc_auc))
+    ax.plot([0,1], [0,1], color='navy', lw=2, linestyle='--')
+    ax.set_xlabel('False Positive Rate')
+    ax.set_ylabel('True Positive Rate')
+    ax.set_title('Receiver Operating Characteristic (ROC) Curve')
+    ax.legend(loc='lower right')
+
+
+def plot_roc(y, y_score, path=None):
+    """
+    Plot the ROC curve of win predictions.
+
+    Parameters
+    ----------
+    y : array-like
+        Actual win labels.
+    y_score : array-like
+        Predicted labels or win probabilities.
+    path : str, optional
+        File the figure is saved to, in the format given by its extension. Default is None.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The figure. It is not attached to pyplot, so no window is opened and nothing is kept
+        open after it is discarded, which makes this safe on headless machines.
+
+    Example
+    -------
+    >>> plot_roc(post_data['y_actuals'], post_data['y_pred'], path='roc.png')
+    """
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    _draw_roc(figure.subplots(), y, y_score)
+    if path is not None:
+        figure.savefig(path)
+    return figure
+
+
+def predict_wins(test_data, train_data=None, n_estimators=400, random_state=42, model_dir=None, model_key=None, plot=None):
     """
     Train a Random Forest classifier on the provided training data and predict
     the outcome of wins on the given test data.
@@ -22,12 +437,21 @@ def predict_wins(test_data, train_data, n_estimators=400, random_state=42):
     -----------
     test_data : pandas.DataFrame
         DataFrame containing the test data.
-    train_data : pandas.DataFrame
-        DataFrame containing the training data.
+    train_data : pandas.DataFrame, optional
+        DataFrame containing the training data. Not needed when `model_key` is given.
     n_estimators : int, optional, default: 400
         The number of trees in the forest.
     random_state : int, optional, default: 42
         Controls the randomness of the estimator.
+    model_dir : str, optional
+        Directory of the model cache. A model already trained on the same features with the
+        same hyperparameters is loaded instead of trained again, see `fit_model`.
+    model_key : str, optional
+        Key of a cached model to predict with, as returned by `fit_model`. Requires `model_dir`.
+    plot : str, optional
+        Where the ROC curve goes: 'show' displays it in a matplotlib window and blocks until it
+        is closed, any other string is a file path it is saved to, see `plot_roc`. Default is
+        None, meaning no plot.
 
     Returns:
     --------
@@ -37,11 +461,11 @@ def predict_wins(test_data, train_data, n_estimators=400, random_state=42):
 
     Notes:
     ------
-    - The function performs data preprocessing on both training and test data,
-      including dropping rows with missing values, creating new features, and
-      converting categorical variables into dummy variables.
+    - The training and test data are both prepared by `build_features`, which
+      drops plays without a down, creates new features, and converts categorical
+      variables into dummy variables with a fixed column layout.
     - It uses a RandomForestClassifier for prediction with specified `n_estimators`
-      and `random_state`.
+      and `random_state`, trained by `fit_model` unless `model_key` is given.
     - The accuracy of the predictions is calculated using accuracy_score from scikit-learn.
 
     Example:
@@ -49,68 +473,23 @@ def predict_wins(test_data, train_data, n_estimators=400, random_state=42):
     >>> accuracy, post_data = predict_wins(test_data, train_data, n_estimators=500, random_state=0)
     >>> print(f'Accuracy: {accuracy}')
     >>> print(post_data.head())
+    >>> accuracy, post_data = predict_wins(next_week, train_data, model_dir='models')  # trained once
+    >>> accuracy, post_data = predict_wins(test_data, train_data, plot='roc.png')
     """
-    # Prepare Training Data
-    train_data = train_data.dropna(subset=['Down'])
-    train_data = train_data[train_data['Down'] != '']
-    train_data['seconds_left'] = train_data.apply(cf.seconds_left, axis=1)
-    train_data['score_diff'] = train_data.iloc[:,5].astype(float) - train_data.iloc[:,6].astype(float)
-    train_data['adjusted_score'] = train_data.apply(cf.adjusted_score_calc, axis=1)
-    train_data['win_team'] = train_data.apply(lambda row: cf.win(pd.DataFrame(row).transpose()), axis=1)
-
-    y_train = train_data['win_team']
-    y_train = y_train.apply(lambda x:float(x[0]))
-
-    columns_to_drop = [5, 6]
-    additional_columns_to_drop = ['Quarter', 'Detail', 'Location', 'Time', 'win_team', 'play_start_time', 'game_id', 'win_team', 'posession']
-
-    train_data = train_data.drop(columns=train_data.columns[columns_to_drop])
-    train_data = train_data.drop(columns=additional_columns_to_drop)
-    train_data['field_side'] = pd.Categorical(train_data['field_side'])
-    train_data['Play_Type'] = pd.Categorical(train_data['Play_Type'])
-    train_data['possession'] = pd.Categorical(train_data['possession'])
-    train_data['Down'] = pd.Categorical(train_data['Down'])
-    train_data['ToGo'] = pd.to_numeric(train_data['ToGo'], errors='coerce')
-    train_data['ToGo'] = train_data['ToGo'].astype(float)
-    train_data['EPB'] = train_data['EPB'].astype(float)
-    train_data['EPA'] = train_data['EPA'].astype(float)
-    train_data = pd.get_dummies(train_data, columns=['Play_Type', 'Down', 'field_side', 'possession'])
-    train_data = train_data.fillna(0)
-
-    # Prepare Test Data
-    test_data = test_data.dropna(subset=['Down'])
-    test_data = test_data[test_data['Down'] != '']
-    test_data['seconds_left'] = test_data.apply(cf.seconds_left, axis=1)
-    test_data['score_diff'] = test_data.iloc[:,5].astype(float) - test_data.iloc[:,6].astype(float)
-    test_data['adjusted_score'] = test_data.apply(cf.adjusted_score_calc, axis=1)
-    test_data['win_team'] = test_data.apply(lambda row: cf.win(pd.DataFrame(row).transpose()), axis=1)
-    test_data['win_team'] = test_data.apply(lambda row: cf.win(pd.DataFrame(row).transpose()), axis=1)
-
-    y = test_data['win_team']
-    columns_to_drop = [5, 6]
-    additional_columns_to_drop = ['Quarter', 'Detail', 'Location', 'Time', 'win_team', 'play_start_time', 'game_id', 'win_team']
-    new_data = test_data.drop(columns=test_data.columns[columns_to_drop])
-    # Optionally, you can also drop additional columns
-    additional_columns_to_drop = ['Quarter', 'Detail', 'Location', 'Time', 'win_team', 'play_start_time']
-    new_data = new_data.drop(columns=additional_columns_to_drop)
-
-    new_data['field_side'] = pd.Categorical(new_data['field_side'])
-    new_data['Play_Type'] = pd.Categorical(new_data['Play_Type'])
-    new_data['possession'] = pd.Categorical(new_data['possession'])
-    new_data['Down'] = new_data['Down'].astype(float)
-    new_data['Down'] = pd.Categorical(new_data['Down'])
-    new_data['ToGo'] = pd.to_numeric(new_data['ToGo'], errors='coerce')
-    new_data['ToGo'] = new_data['ToGo'].astype(float)
-    new_data['EPB'] = new_data['EPB'].astype(float)
-    new_data['EPA'] = new_data['EPA'].astype(float)
-    new_data['yardline'] = new_data['yardline'].astype(float)
-    new_data = pd.get_dummies(new_data, columns=['Play_Type', 'Down', 'field_side', 'possession'])
-
-    y = y.apply(lambda x:float( x[0]))
-    new_data = new_data.fillna(0)
-
-    rf_classifier = RandomForestClassifier(n_estimators=n_estimators, random_state=random_state)
-    rf_classifier.fit(train_data, y_train)
+    from sklearn.metrics import accuracy_score
+
+    if model_key is not None:
+        if model_dir is None:
+            raise ValueError('Predicting with model_key requires the model_dir of the model cache.')
+        rf_classifier = load_model(model_key, model_dir)
+        if rf_classifier is None:
+            raise FileNotFoundError(f'No model {model_key} in the model cache at {model_dir}.')
+    elif train_data is None:
+        raise ValueError('predict_wins needs either train_data or a cached model_key.')
+    else:
+        rf_classifier, _ = fit_model(train_data, n_estimators, random_state, model_dir)
+    new_data, y = build_features(test_data)
+
     y_pred = rf_classifier.predict(new_data)
     accuracy = accuracy_score(y, y_pred)
     print(f'accuracy: {accuracy}')
@@ -119,17 +498,13 @@ def predict_wins(test_data, train_data, n_estimators=400, random_state=42):
     post_data['y_actuals'] = y
     post_data['y_pred'] = y_pred
 
-    fpr, tpr, _ = roc_curve(y, y_pred)
-    roc_auc = auc(fpr, tpr)
-    plt.figure()
-    plt.plot(fpr, tpr, color='darkorange', lw=2, label='ROC curve (area = {:.2f})'.format(roc_auc))
-    plt.plot([0,1], [0,1], color='navy', lw=2, linestyle='--')
-    plt.xlabel('False Positive Rate')
-    plt.ylabel('True Positive Rate')
-    plt.title('Receiver Operating Characteristic (ROC) Curve')
-    plt.legend(loc='lower right')
-    plt.show()
-    
+    if plot == 'show':
+        import matplotlib.pyplot as plt
+
+        _draw_roc(plt.figure().subplots(), y, y_pred)
+        plt.show()
+    elif plot is not None:
+        plot_roc(y, y_pred, path=plot)
 
     return accuracy, post_data
 
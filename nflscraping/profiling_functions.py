@@ -0,0 +1,196 @@
+import contextlib
+import json
+import threading
+import time
+import tracemalloc
+
+
+class StageRecorder:
+    """
+    Opt-in recorder of the wall time, CPU time and peak memory of each stage of scraping a game.
+
+    Parameters
+    ----------
+    path : str, optional
+        JSON lines file every event is appended to. Default is None.
+    callback : callable, optional
+        Function called with every event, a dict. Default is None.
+    trace_memory : bool, optional
+        If True, the peak memory of each stage is measured with `tracemalloc`, which is started
+        if it is not already running and slows Python allocations down. Default is True.
+
+    Notes
+    -----
+    Each stage produces an event with keys 'event' ('stage'), 'game' (URL of the game being
+    scraped, see `game`), 'stage', 'wall_seconds', 'cpu_seconds' (CPU time of the thread running
+    the stage), 'peak_memory_bytes' (the most memory allocated above the level at the start of the
+    stage, or None) and 'timestamp'. Events are also kept in `events` and aggregated by `summary`;
+    `scraping_functions.scrape_games` emits that aggregate as a 'summary' event at the end of a run.
+
+    The recorder can be shared by the threads of `scraping_functions.scrape_games`. Wall and CPU
+    times stay per stage, but `tracemalloc` traces the whole process, so peak memory is only
+    exact with a single worker. With worker processes, the stages run in a process are recorded
+    there and handed back to the recorder, so their peak memory is that of the worker process.
+
+    Example
+    -------
+    >>> with StageRecorder('stages.jsonl') as recorder:
+    ...     scrape_games(game_links, workers=1, cache_dir='html_cache', recorder=recorder)
+    >>> recorder.summary()['stages']['parse']
+    {'count': 16, 'wall_seconds': 0.98, 'mean_wall_seconds': 0.06, ...}
+    """
+
+    def __init__(self, path=None, callback=None, trace_memory=True):
+        self.path = path
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextlib.contextmanager
+    def game(self, game_url):
+        """
+        Attribute the stages run by this thread inside the block to a game.
+        """
+        previous = getattr(self._local, 'game', None)
+        self._local.game = game_url
+        try:
+            yield
+        finally:
+            self._local.game = previous
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Time the block as the stage `name` and emit its event, unless the block raises.
+        """
+        if self.trace_memory:
+            start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        yield
+        event = {
+            'event': 'stage',
+            'game': getattr(self._local, 'game', None),
+            'stage': name,
+            'wall_seconds': time.perf_counter() - start_wall,
+            'cpu_seconds': time.thread_time() - start_cpu,
+            'peak_memory_bytes': tracemalloc.get_traced_memory()[1] - start_memory if self.trace_memory else None,
+            'timestamp': time.time()
+        }
+        self.emit(event)
+
+    def emit(self, event):
+        """
+        Keep an event, append it to `path` and pass it to `callback`.
+        """
+        with self._lock:
+            self.events.append(event)
+            if self.path is not None:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(event) + '\n')
+        if self.callback is not None:
+            self.callback(event)
+
+    def summary(self, slowest=5):
+        """
+        Aggregate the stage events recorded so far.
+
+        Parameters
+        ----------
+        slowest : int, optional
+            Number of slowest games to list. Default is 5.
+
+        Returns
+        -------
+        dict
+            'stages' maps each stage to its count, total, mean and max wall seconds, total CPU
+            seconds and max peak memory. 'slowest_games' lists (game, wall seconds) pairs of the
+            games with the largest total wall time over their stages.
+        """
+        with self._lock:
+            events = [event for event in self.events if event['event'] == 'stage']
+        stages = {}
+        games = {}
+        for event in events:
+            stats = stages.setdefault(event['stage'], {'count': 0, 'wall_seconds': 0.0, 'max_wall_seconds': 0.0,
+                                                       'cpu_seconds': 0.0, 'max_peak_memory_bytes': None})
+            stats['count'] += 1
+            stats['wall_seconds'] += event['wall_seconds']
+            stats['max_wall_seconds'] = max(stats['max_wall_seconds'], event['wall_seconds'])
+            stats['cpu_seconds'] += event['cpu_seconds']
+            if event['peak_memory_bytes'] is not None:
+                stats['max_peak_memory_bytes'] = max(stats['max_peak_memory_bytes'] or 0, event['peak_memory_bytes'])
+            if event['game'] is not None:
+                games[event['game']] = games.get(event['game'], 0.0) + event['wall_seconds']
+        for stats in stages.values():
+            stats['mean_wall_seconds'] = stats['wall_seconds'] / stats['count']
+        slowest_games = sorted(games.items(), key=lambda item: item[1], reverse=True)[:slowest]
+        return {'stages': stages, 'slowest_games': slowest_games}
+
+    def emit_summary(self):
+        """
+        Emit the output of `summary` as a 'summary' event.
+        """
+        self.emit({'event': 'summary', **self.summary(), 'timestamp': time.time()})
+
+    def close(self):
+        """
+        Stop `tracemalloc` if it was started by this recorder.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def record_stage(recorder, name):
+    """
+    Time a block as a stage of `recorder`, or do nothing if `recorder` is None.
+
+    Parameters
+    ----------
+    recorder : StageRecorder or None
+        The recorder.
+    name : str
+        Name of the stage.
+
+    Returns
+    -------
+    context manager
+
+    Example
+    -------
+    >>> with record_stage(recorder, 'parse'):
+    ...     tables = extract_tables(html)
+    """
+    return recorder.stage(name) if recorder is not None else contextlib.nullcontext()
+
+
+def record_game(recorder, game_url):
+    """
+    Attribute the stages inside a block to a game, or do nothing if `recorder` is None.
+
+    Parameters
+    ----------
+    recorder : StageRecorder or None
+        The recorder.
+    game_url : str
+        URL of the game.
+
+    Returns
+    -------
+    context manager
+    """
+    return recorder.game(game_url) if recorder is not None else contextlib.nullcontext()
@@ -1,14 +1,189 @@
 
 import pandas as pd
-import requests
 import numpy as np
-from bs4 import BeautifulSoup, Comment
 import re
 import time
+import threading
+import contextlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
 from nflscraping import cleaning_functions as cf
+from nflscraping import caching_functions as cache
+from nflscraping import clock_functions as clock
+from nflscraping import writing_functions as wf
+from nflscraping import manifest_functions as mf
+from nflscraping import profiling_functions as prof
+from nflscraping import fetching_functions as fetch
 from math import inf
+from importlib.util import find_spec
+
+# requests and bs4 are imported by the functions using them, so importing this module does not
+# pay for them until a page is fetched or parsed
+PARSER = 'lxml' if find_spec('lxml') is not None else 'html.parser'
+# start method of the cleaning processes: they are started from the fetching threads, and forking
+# a process while other threads hold locks (connection pool, rate limiter, ...) can deadlock it
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# commented tables on a boxscore page, keyed by table id, with the id of the div wrapping them
+TABLE_WRAPPERS = {
+    'home_drives': 'all_home_drives',
+    'vis_drives': 'all_vis_drives',
+    'pbp': 'all_pbp'
+}
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter used to bound the number of requests sent to a host.
+
+    Parameters
+    ----------
+    rate : float, optional
+        Number of tokens added to the bucket per second. Default is 0.1, i.e. one
+        request every 10 seconds.
+    capacity : int, optional
+        Maximum number of tokens the bucket can hold, which bounds the size of a burst.
+        Default is 1.
+
+    Notes
+    -----
+    The limiter is thread safe, so one instance can be shared by every worker that
+    fetches pages from the same host. Calls to `acquire` block until a token is available.
+
+    Example
+    -------
+    >>> limiter = RateLimiter(rate=0.5)
+    >>> limiter.acquire()  # returns immediately, the next call waits ~2 seconds
+    """
+
+    def __init__(self, rate=0.1, capacity=1):
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0.')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available and consume it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
 
 # functions
+def _slice_wrappers(html, wrapper_ids):
+    """
+    Cut the divs with the given ids, up to the end of their first comment, out of the raw page.
+
+    Returns None if any of the divs cannot be located, in which case the whole page should be parsed.
+    """
+    snippets = []
+    for wrapper_id in wrapper_ids:
+        position = html.find(f'id="{wrapper_id}"')
+        if position == -1:
+            return None
+        start = html.rfind('<div', 0, position)
+        comment_start = html.find('<!--', position)
+        end = html.find('-->', comment_start)
+        if start == -1 or comment_start == -1 or end == -1:
+            return None
+        snippets.append(html[start:end + 3] + '</div>')
+    return '\n'.join(snippets)
+
+
+def _read_table(table, row_attrs=None):
+    """
+    Read the column headers and the body rows of an html table as lists of cell text, keeping
+    only the rows matching `row_attrs` if given.
+    """
+    cols = table.find('thead').find('tr')
+    column_headers = [th.get_text(strip=True) for th in cols.find_all('th')]
+    rows = table.find('tbody').find_all('tr', row_attrs or {})
+    row_data = [[column.get_text(strip=False) for column in row.find_all(['th', 'td'], recursive=False)] for row in rows]
+    return column_headers, row_data
+
+
+def extract_tables(html, table_ids=('home_drives', 'vis_drives', 'pbp'), parser=None):
+    """
+    Extract the commented tables of a boxscore page in a single pass over the document.
+
+    Parameters
+    ----------
+    html : str
+        The raw HTML of a Pro Football Reference boxscore page.
+    table_ids : iterable of str, optional
+        Ids of the tables to extract, any of the keys of `TABLE_WRAPPERS`. Default is
+        ('home_drives', 'vis_drives', 'pbp'). Requesting fewer tables parses less of the page.
+    parser : str, optional
+        BeautifulSoup parser backend. Default is None, meaning `PARSER`, which is 'lxml'
+        when it is installed and 'html.parser' otherwise.
+
+    Returns
+    -------
+    tables : dict
+        Maps each table id to a dict with keys 'team' (first word of the section heading,
+        e.g. the team mascot for drive tables), 'columns' (list of column headers) and
+        'rows' (list of rows, each a list of cell text). Tables missing from the page are
+        left out.
+
+    Notes
+    -----
+    Pro Football Reference ships most tables inside HTML comments. The divs wrapping the
+    requested tables are cut out of the raw text (falling back to the whole page if one cannot
+    be located) and only those divs are built while parsing. The comments of all of them are
+    then joined and parsed once more, again keeping only the requested tables. Play-by-play rows
+    with a class attribute (headers repeated in the body, dividers) are skipped, as in `scrape_pbp`.
+
+    Example
+    -------
+    >>> tables = extract_tables(html)
+    >>> tables['home_drives']['team']
+    'Chiefs'
+    >>> pbp_only = extract_tables(html, table_ids=['pbp'])
+    """
+    from bs4 import BeautifulSoup, Comment, SoupStrainer
+
+    parser = parser or PARSER
+    table_ids = list(table_ids)
+    wrapper_ids = [TABLE_WRAPPERS[table_id] for table_id in table_ids]
+    snippet = _slice_wrappers(html, wrapper_ids)
+    if snippet is not None:
+        html = snippet
+    wrappers = BeautifulSoup(html, parser, parse_only=SoupStrainer('div', id=wrapper_ids))
+
+    headings = {}
+    comments = []
+    for wrapper in wrappers.find_all('div', id=wrapper_ids):
+        h2 = wrapper.find('h2')
+        headings[wrapper['id']] = h2.get_text(strip=False).split()[0] if h2 else None
+        comments.extend(str(comment) for comment in wrapper.find_all(string=lambda text: isinstance(text, Comment)))
+
+    tables = {}
+    comment_soup = BeautifulSoup('\n'.join(comments), parser, parse_only=SoupStrainer('table', id=table_ids))
+    for table in comment_soup.find_all('table', id=table_ids):
+        row_attrs = {'class': ''} if table['id'] == 'pbp' else None
+        columns, rows = _read_table(table, row_attrs)
+        tables[table['id']] = {
+            'team': headings.get(TABLE_WRAPPERS[table['id']]),
+            'columns': columns,
+            'rows': rows
+        }
+    return tables
+
+
 def get_drive_table(team, soup):
     """
     Extracts drive data from a BeautifulSoup object for a specific team.
@@ -42,6 +217,8 @@ def get_drive_table(team, soup):
         ids = ['all_home_drives', 'home_drives']
     if team == 'vis':
         ids = ['all_vis_drives', 'vis_drives']
+    from bs4 import BeautifulSoup, Comment
+
     drive_data = []
     parent = soup.find('div', {'id': ids[0]})
     team = parent.find('h2').get_text(strip=False)
@@ -53,13 +230,7 @@ def get_drive_table(team, soup):
             comment_soup = BeautifulSoup(str(div), 'html.parser')
             table = comment_soup.find('table', {'id': ids[1]})
             if table:
-                cols = table.find('thead').find('tr')
-                column_headers = [th.get_text(strip=True) for th in cols.find_all('th')]
-                drives = table.find('tbody').find_all('tr')
-                for drive in drives:
-                    columns = drive.find_all(['th', 'td'])
-                    row_data = [column.get_text(strip=False) for column in columns]
-                    drive_data.append(row_data)
+                column_headers, drive_data = _read_table(table)
     drives_df = pd.DataFrame(columns = column_headers, data = drive_data)
     drives_df['team'] = team
     return drives_df
@@ -67,7 +238,7 @@ def get_drive_table(team, soup):
 
 def scrape_pbp(game_page_soup):
     """
-    Scrape play-by-play (PBP) data from a BeautifulSoup object representing a game page from the pro football reference site. Main function used in scrape_game_data() function.
+    Scrape play-by-play (PBP) data from a BeautifulSoup object representing a game page from the pro football reference site. scrape_game_data() reads the same table through extract_tables().
 
     Parameters
     ----------
@@ -91,6 +262,8 @@ def scrape_pbp(game_page_soup):
     >>> pbp_data = scrape_pbp(soup)
     """
 
+    from bs4 import BeautifulSoup, Comment
+
     pbp_datas = []
     pbp_parent = game_page_soup.find('div', {'class': 'table_wrapper', 'id': 'all_pbp'})
     if pbp_parent:
@@ -99,18 +272,56 @@ def scrape_pbp(game_page_soup):
             comment_soup = BeautifulSoup(str(pbp_div), 'html.parser')
             pbp_table = comment_soup.find('table', {'id': 'pbp'})
             if pbp_table:
-                cols = pbp_table.find('thead').find('tr')
-                column_headers = [th.get_text(strip=True) for th in cols.find_all('th')]
-                plays = pbp_table.find('tbody').find_all('tr',{'class': ''})
-                for play in plays:
-                    columns = play.find_all(['th', 'td'])
-                    play_data = [column.get_text(strip=False) for column in columns]
-                    pbp_datas.append(play_data)
+                column_headers, pbp_datas = _read_table(pbp_table, {'class': ''})
     pbp_datas = pd.DataFrame(columns = column_headers, data = pbp_datas)
     return pbp_datas
 
 
-def scrape_game_data(game_url):
+def fetch_html(game_url, rate_limiter=None, cache_dir=None, offline=False, client=None):
+    """
+    Fetch the raw HTML of a Pro Football Reference page, going through the on-disk cache if one is given.
+
+    Parameters
+    ----------
+    game_url : str
+        The URL of the page to fetch.
+    rate_limiter : RateLimiter, optional
+        Limiter to acquire a token from before a network request. Default is None.
+    cache_dir : str, optional
+        Directory of the raw HTML cache. Cached pages are returned without a request and
+        downloaded pages are added to the cache. Default is None, meaning no cache.
+    offline : bool, optional
+        If True, pages are only read from the cache and no network request is ever made.
+        Default is False.
+    client : fetching_functions.HttpClient, optional
+        Client sending the request, with its connection pool, timeouts and retries. Default is
+        None, meaning the client shared by every call, see `fetching_functions.default_client`.
+
+    Returns
+    -------
+    str
+        The raw HTML of the page.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `offline` is True and the page is not in the cache.
+    requests.RequestException
+        If the page cannot be fetched, after the retries of the client.
+    """
+    if cache_dir is not None:
+        html = cache.read_cached_html(game_url, cache_dir)
+        if html is not None:
+            return html
+    if offline:
+        raise FileNotFoundError(f'{game_url} is not in the cache at {cache_dir}.')
+    html = (client or fetch.default_client()).get(game_url, rate_limiter)
+    if cache_dir is not None:
+        cache.write_cached_html(game_url, html, cache_dir)
+    return html
+
+
+def scrape_game_data(game_url, rate_limiter=None, cache_dir=None, offline=False, recorder=None, with_drives=False, client=None):
     """
     Scrape game data from the specified Pro Football Reference game URL.
 
@@ -118,121 +329,208 @@ def scrape_game_data(game_url):
     ----------
     game_url : str
         The URL of the Pro Football Reference game page to scrape.
+    rate_limiter : RateLimiter, optional
+        Limiter to acquire a token from before the page is requested. Default is None,
+        meaning the request is sent immediately.
+    cache_dir : str, optional
+        Directory of the raw HTML cache used by `fetch_html`. Default is None.
+    offline : bool, optional
+        If True, the page is read from `cache_dir` without any network call. Default is False.
+    recorder : profiling_functions.StageRecorder, optional
+        Recorder of the time and memory of the fetch and cleaning stages, attributed to
+        `game_url`. Default is None, meaning nothing is recorded.
+    with_drives : bool, optional
+        If True, the drive summary of the game is returned too. Default is False.
+    client : fetching_functions.HttpClient, optional
+        Client fetching the page, see `fetch_html`. Default is None.
 
     Returns
     -------
     pbp_data : pandas.DataFrame
-        A DataFrame containing cleaned play-by-play (PBP) data for the game.
+        A DataFrame containing cleaned play-by-play (PBP) data for the game, or a tuple
+        (pbp_data, drive_data) with `with_drives`, see `clean_game_html`.
+
+    Notes
+    -----
+    The page is fetched with `fetch_html` and cleaned with `clean_game_html`.
+
+    Example
+    -------
+    >>> url = 'https://www.pro-football-reference.com/boxscores/202309070kan.htm'
+    >>> game_data = scrape_game_data(url, cache_dir='html_cache')
+    """
+    with prof.record_game(recorder, game_url):
+        with prof.record_stage(recorder, 'fetch'):
+            html = fetch_html(game_url, rate_limiter=rate_limiter, cache_dir=cache_dir, offline=offline, client=client)
+        return clean_game_html(html, recorder=recorder, with_drives=with_drives)
+
+
+def clean_game_html(html, recorder=None, with_drives=False):
+    """
+    Build the cleaned play-by-play data of a game from the raw HTML of its Pro Football Reference page.
+
+    Parameters
+    ----------
+    html : str
+        The raw HTML of a Pro Football Reference boxscore page.
+    recorder : profiling_functions.StageRecorder, optional
+        Recorder of the time and memory of the 'parse', 'drives', 'pbp' and 'clean_*' stages.
+        Default is None, meaning nothing is recorded.
+    with_drives : bool, optional
+        If True, the drive summary of the game is returned too. Default is False.
+
+    Returns
+    -------
+    pbp_data : pandas.DataFrame
+        A DataFrame containing cleaned play-by-play (PBP) data for the game, typed with the compact
+        schema of `writing_functions.PLAY_DTYPES`. The abbreviations of the two teams are kept in
+        `pbp_data.attrs['teams']`, e.g. {'away': 'DET', 'home': 'KAN'}.
+    drive_data : pandas.DataFrame
+        Only with `with_drives`: one row per drive of the scraped drive tables, with its
+        possession, start and end times and the span of its plays in `pbp_data`, see
+        `cleaning_functions.summarize_drives`.
 
     Notes
     -----
     This function extracts drive data for the home and visiting teams, as well as play-by-play
-    (PBP) data, from the specified game URL. It performs data cleaning and transformation,
+    (PBP) data, from the page. It performs data cleaning and transformation,
     including handling time-related columns and determining possession.
 
     Example
     -------
-    >>> url = 'https://www.pro-football-reference.com/boxscores/202309070kan.htm'
-    >>> game_data = scrape_game_data(url)
+    >>> html = fetch_html('https://www.pro-football-reference.com/boxscores/202309070kan.htm')
+    >>> game_data = clean_game_html(html)
     """
 
-    team_keys = {
-        'DET': 'Lions',
-        'KAN': 'Chiefs',
-        'ATL': 'Falcons',
-        'CAR': 'Panthers',
-        'CLE': 'Browns', 
-        'CIN': 'Bengals', 
-        'IND': 'Colts', 
-        'JAX': 'Jaguars',
-        'MIN': 'Vikings', 
-        'TAM': 'Buccaneers',
-        'NOR': 'Saints', 
-        'TEN': 'Titans',
-        'PIT': 'Steelers', 
-        'SFO': '49ers', 
-        'BAL': 'Ravens',
-        'HOU': 'Texans', 
-        'WAS': 'Commanders',
-        'ARI': 'Cardinals',
-        'CHI': 'Bears', 
-        'GNB': 'Packers',
-        'DEN': 'Broncos', 
-        'LVR': 'Raiders', 
-        'NWE': 'Patriots', 
-        'PHI': 'Eagles', 
-        'LAC': 'Chargers', 
-        'MIA': 'Dolphins',
-        'SEA': 'Seahawks',
-        'LAR': 'Rams',
-        'NYG': 'Giants',
-        'DAL': 'Cowboys',
-        'NYJ': 'Jets', 
-        'BUF': 'Bills'
-    }
-    pbp_data = []
-    # game_url = 'https://www.pro-football-reference.com/boxscores/202309110nyj.htm'
-    r = requests.get(game_url)
-    game_page_soup = BeautifulSoup(r.text, 'html.parser')
-    # scraping drive data for home and away team
-    home_drives = get_drive_table('home', game_page_soup)
-    vis_drives = get_drive_table('vis', game_page_soup)
-    # getting home and away team variables
-    home_team = home_drives['team'][0]
-    vis_team = vis_drives['team'][0]
-    home_vis = {home_team: 'home', vis_team: 'away'}
-
-    teams = [home_team, vis_team]
-    drives = pd.concat([home_drives, vis_drives], axis=0)
-    drives['Quarter'] = drives['Quarter'].astype(int)
-    drives['minute'] = drives['Time'].str.extract(r'([0-9]+):').astype(int)
-    drives['seconds'] = drives['Time'].str.extract(r'[0-9]+:([0-9]+)').astype(int)
-    drives['seconds_ratio'] = (drives['seconds'] / 60).astype(float)
-    drives['Numeric_time'] = drives['minute'] + drives['seconds_ratio']
-    drives = drives.sort_values(by=['Quarter', 'Numeric_time'], ascending=[True, False]).reset_index()
-    drives['drive_time'] = cf.elapsed_time(drives['Numeric_time'])
-    drives['drive_start_time'] = cf.game_time(drives['drive_time'])
-    drives = drives.drop(columns=['minute', 'seconds', 'seconds_ratio', 'index', '#', 'Numeric_time', 'drive_time'])
-    # scraping pbp data
-    pbp_data = scrape_pbp(game_page_soup)
-    # Setting up receiving and kicking teams
-    coin_toss = pbp_data.iloc[0]
-    pbp_data = pbp_data.drop(0)
-    coin_toss = coin_toss[7]
-    teams = re.findall(r'\b[A-Z][a-zA-Z]*\b', coin_toss)
-    match = re.search(r"(\w+)\s+to\s+receive\s+the\s+opening\s+kickoff", coin_toss)
-    if match:
-        receiving_team = match.group(1)
-    # dropping timeouts
-    pbp_data = pbp_data[pbp_data['Location'].str.strip() != '']
-    pbp_data = pbp_data.dropna(subset=['Location'])
+    team_keys = cf.TEAM_MASCOTS
+    with prof.record_stage(recorder, 'parse'):
+        tables = extract_tables(html)
+    with prof.record_stage(recorder, 'drives'):
+        # scraping drive data for home and away team
+        home_drives = pd.DataFrame(columns=tables['home_drives']['columns'], data=tables['home_drives']['rows'])
+        home_drives['team'] = tables['home_drives']['team']
+        vis_drives = pd.DataFrame(columns=tables['vis_drives']['columns'], data=tables['vis_drives']['rows'])
+        vis_drives['team'] = tables['vis_drives']['team']
+        # getting home and away team variables
+        home_team = home_drives['team'][0]
+        vis_team = vis_drives['team'][0]
+        home_vis = {home_team: 'home', vis_team: 'away'}
+
+        teams = [home_team, vis_team]
+        drives = pd.concat([home_drives, vis_drives], axis=0)
+        drives['Quarter'] = clock.quarter_numbers(drives['Quarter'])
+        drives['Numeric_time'] = clock.parse_clock(drives['Time'])
+        drives = drives.sort_values(by=['Quarter', 'Numeric_time'], ascending=[True, False]).reset_index()
+        # playoff overtime periods are longer, see clock_functions.overtime_minutes
+        ot_minutes = clock.overtime_minutes(drives['Numeric_time'], drives['Quarter'])
+        drives['drive_start_time'] = clock.game_time(clock.elapsed_time(drives['Numeric_time'], drives['Quarter'], ot_minutes))
+        drives = drives.drop(columns=['index', '#', 'Numeric_time'])
+    with prof.record_stage(recorder, 'pbp'):
+        # scraping pbp data
+        pbp_data = pd.DataFrame(columns=tables['pbp']['columns'], data=tables['pbp']['rows'])
+        # Setting up receiving and kicking teams
+        coin_toss = pbp_data.iloc[0]
+        pbp_data = pbp_data.drop(0)
+        coin_toss = coin_toss[7]
+        teams = re.findall(r'\b[A-Z][a-zA-Z]*\b', coin_toss)
+        match = re.search(r"(\w+)\s+to\s+receive\s+the\s+opening\s+kickoff", coin_toss)
+        if match:
+            receiving_team = match.group(1)
+        # dropping timeouts
+        pbp_data = pbp_data[pbp_data['Location'].str.strip() != '']
+        pbp_data = pbp_data.dropna(subset=['Location'])
     print(f'{home_team} vs. {vis_team} \n total plays: {len(pbp_data)}')
     # General Cleaning
-    pbp_data['Quarter'] = pbp_data['Quarter']
-    pbp_data['Quarter'] = [x if x != 'OT' else int(5) for x in pbp_data['Quarter']]
-    pbp_data['field_side'] = pbp_data['Location'].str.extract(r'([A-Z]+)')
-    pbp_data['field_side'] = [home_vis[team_keys[x]] if x == teams[0] else home_vis[team_keys[x]] for x in pbp_data['field_side']]
-    pbp_data['yardline'] = pbp_data['Location'].str.extract(r'([0-9]+)')
-    pbp_data['yardline'] = pbp_data['yardline'].astype(int)
-    pbp_data['minute'] = pbp_data['Time'].str.extract(r'([0-9]+):').astype(int)
-    pbp_data['seconds'] = pbp_data['Time'].str.extract(r'[0-9]+:([0-9]+)').astype(int)
-    pbp_data['seconds_ratio'] = (pbp_data['seconds'] / 60).astype(float)
-    pbp_data['Numeric_time'] = pbp_data['minute'] + pbp_data['seconds_ratio']
-    pbp_data['play_time'] = cf.elapsed_time(pbp_data['Numeric_time'])
-    pbp_data['play_start_time'] = cf.game_time(pbp_data['play_time'])
-    pbp_data = pbp_data.drop(columns=['minute', 'seconds', 'seconds_ratio','Numeric_time', 'play_time'])
-    pbp_data['Play_Type'] = pbp_data['Detail'].apply(cf.play_type)
-    pbp_data['possession'] = pbp_data['play_start_time'].apply(lambda play_start: cf.determine_possession(play_start, drives))
-    pbp_data['possession'] = [home_vis[team_keys[x]] if x == teams[0] else home_vis[team_keys[x]] for x in pbp_data['possession']]
-    yards_gained = cf.yards_gained(pbp_data)
-    pbp_data['Yardage'] = yards_gained
+    with prof.record_stage(recorder, 'clean_location'):
+        pbp_data['Quarter'] = pbp_data['Quarter']
+        pbp_data['Quarter'] = [x if x != 'OT' else int(5) for x in pbp_data['Quarter']]
+        pbp_data['field_side'] = pbp_data['Location'].str.extract(r'([A-Z]+)')
+        pbp_data['field_side'] = [home_vis[team_keys[x]] if x == teams[0] else home_vis[team_keys[x]] for x in pbp_data['field_side']]
+        pbp_data['yardline'] = pbp_data['Location'].str.extract(r'([0-9]+)')
+        pbp_data['yardline'] = pbp_data['yardline'].astype(int)
+    with prof.record_stage(recorder, 'clean_clock'):
+        pbp_data['play_start_time'] = clock.start_times(pbp_data['Time'], pbp_data['Quarter'], ot_minutes)
+    with prof.record_stage(recorder, 'clean_play_type'):
+        pbp_data['Play_Type'] = cf.classify_plays(pbp_data['Detail'])
+    with prof.record_stage(recorder, 'clean_possession'):
+        pbp_data['possession'] = cf.assign_possession(pbp_data['play_start_time'], drives)
+        pbp_data['possession'] = pbp_data['possession'].map(team_keys).map(home_vis)
+        drives['possession'] = drives['team'].map(home_vis)
+    with prof.record_stage(recorder, 'clean_yardage'):
+        yards_gained = cf.yards_gained(pbp_data)
+        pbp_data['Yardage'] = yards_gained
+    teams = {home_vis[team_keys[team]]: team for team in pbp_data.columns[5:7]}
     pbp_data = pbp_data.rename(columns={pbp_data.columns[5]: home_vis[team_keys[pbp_data.columns[5]]], 
                                     pbp_data.columns[6]: home_vis[team_keys[pbp_data.columns[6]]]})
-    
+    if with_drives:
+        with prof.record_stage(recorder, 'clean_drives'):
+            drive_data = wf.type_columns(cf.summarize_drives(pbp_data, drives))
+    pbp_data = wf.type_columns(pbp_data)
+    pbp_data.attrs['teams'] = teams
+
+    if with_drives:
+        return pbp_data, drive_data
     return pbp_data
 
 
-def scrape_games(game_links=[], data_file_path ='data.csv', game_file_path='games.csv'):
+def _fetch_game(game_url, rate_limiter, cache_dir, offline, recorder, client):
+    """
+    Fetch the page of a game as the 'fetch' stage of `recorder`.
+    """
+    with prof.record_game(recorder, game_url), prof.record_stage(recorder, 'fetch'):
+        return fetch_html(game_url, rate_limiter=rate_limiter, cache_dir=cache_dir, offline=offline, client=client)
+
+
+def _clean_game_process(html, game_url, record, trace_memory):
+    """
+    Clean the page of a game in a worker process.
+
+    Returns the plays and drives and the stage events recorded in the process, which the parent
+    hands to its own recorder since a recorder cannot be shared across processes.
+    """
+    recorder = prof.StageRecorder(trace_memory=trace_memory) if record else None
+    with prof.record_game(recorder, game_url):
+        game_data = clean_game_html(html, recorder=recorder, with_drives=True)
+    if recorder is None:
+        return game_data, []
+    recorder.close()
+    return game_data, recorder.events
+
+
+def _submit_pipelined(fetchers, cleaners, game_url, rate_limiter, cache_dir, offline, recorder, client):
+    """
+    Fetch a game on the `fetchers` thread pool, then clean it on the `cleaners` process pool as soon
+    as its page arrives.
+
+    Returns a future holding the cleaned plays and drives, or the exception raised by either step.
+    """
+    result = Future()
+
+    def cleaned(clean_future):
+        try:
+            game_data, events = clean_future.result()
+        except BaseException as e:
+            result.set_exception(e)
+            return
+        for event in events:
+            recorder.emit(event)
+        result.set_result(game_data)
+
+    def fetched(fetch_future):
+        try:
+            html = fetch_future.result()
+            clean_future = cleaners.submit(_clean_game_process, html, game_url, recorder is not None,
+                                           recorder is not None and recorder.trace_memory)
+        except BaseException as e:
+            result.set_exception(e)
+            return
+        clean_future.add_done_callback(cleaned)
+
+    fetchers.submit(_fetch_game, game_url, rate_limiter, cache_dir, offline, recorder, client).add_done_callback(fetched)
+    return result
+
+
+def scrape_games(game_links=[], data_file_path ='data.csv', game_file_path='games.csv', workers=1, requests_per_second=0.1, cache_dir=None, offline=False, data_format='csv', season=None, week=None, manifest_path=None, rate_limiter=None, recorder=None, processes=0, drive_file_path=None, client=None):
     """
     Scrape game data from a list of Pro Football Reference game URLs and save the results.
 
@@ -240,10 +538,56 @@ def scrape_games(game_links=[], data_file_path ='data.csv', game_file_path='game
     ----------
     game_links : list of str, optional
         List of Pro Football Reference game URLs to scrape. Default is an empty list.
-    data_file_extension : str, optional
-        Extension for the data file CSV. Default is 'data'.
-    game_file_extension : str, optional
-        Extension for the game file CSV. Default is 'games'.
+    data_file_path : str, optional
+        Path the play data is written to: a CSV file, or a directory for the 'parquet' format.
+        Default is 'data.csv'.
+    game_file_path : str, optional
+        Path the game data is written to, in the same format as the play data. Default is 'games.csv'.
+    workers : int, optional
+        Number of games fetched concurrently, and also parsed by the same threads unless
+        `processes` is set. Default is 1.
+    requests_per_second : float, optional
+        Maximum request rate to the host, shared by all workers. Default is 0.1,
+        i.e. one request every 10 seconds.
+    cache_dir : str, optional
+        Directory of the raw HTML cache. Downloaded pages are stored there and cached pages
+        are not requested again. Default is None, meaning no cache.
+    offline : bool, optional
+        If True, every page is read from `cache_dir` and no network call is made. If
+        `game_links` is empty, every game in the cache is rebuilt. Default is False.
+    data_format : str, optional
+        Output format, 'csv', 'parquet' (a directory of one Parquet file per game) or 'sqlite'
+        (tables of an indexed database, see `database_functions`, the paths being the same file).
+        Default is 'csv'.
+    season : int, optional
+        Season of the games. With the 'parquet' format, the games are written to the partition
+        'season=<season>/week=<week>' of the datasets, the layout read by
+        `loading_functions.load_data(root=...)`. With the 'sqlite' format, the rows are tagged
+        with the season and week, which are then required. Default is None.
+    week : int, optional
+        Week of the games, used with `season`. Default is None.
+    manifest_path : str, optional
+        Path of a JSON checkpoint manifest recording the game id and the completed, failed or
+        pending status of every link. Default is None, meaning no checkpointing.
+    rate_limiter : RateLimiter, optional
+        Limiter shared with other callers, used for every request instead of the per-host limiters
+        built from `requests_per_second`. Default is None.
+    recorder : profiling_functions.StageRecorder, optional
+        Recorder of the time and memory of the stages of every game (fetch, parse, drives, pbp,
+        clean_* and write). A summary of the run is emitted when it ends. Default is None,
+        meaning nothing is recorded.
+    processes : int, optional
+        Number of worker processes parsing and cleaning pages, started with the `START_METHOD`
+        (not fork), so a script using them needs an ``if __name__ == '__main__':`` guard. Default
+        is 0, meaning pages are parsed by the fetching threads.
+    drive_file_path : str, optional
+        Path the drive summaries are written to, in the same format and partition as the play
+        data, with the columns of `writing_functions.DRIVE_COLUMNS`. Default is None, meaning
+        drives are not written.
+    client : fetching_functions.HttpClient, optional
+        Client shared by every fetching thread, with its keep-alive connection pool, timeouts and
+        retries. Default is None, meaning a client with one pooled connection per thread is opened
+        for the run and closed at its end.
 
     Returns
     -------
@@ -251,59 +595,135 @@ def scrape_games(game_links=[], data_file_path ='data.csv', game_file_path='game
 
     Notes
     -----
-    This function iterates through the provided list of game links, extracts game and play-by-play data
-    using the `scrape_game_data` function, and saves the cleaned data in CSV files. It introduces a
-    delay of 30 seconds between each scraping operation to avoid overloading the server.
+    This function scrapes the provided list of game links with `scrape_game_data`, using a pool of
+    `workers` threads. Parsing and cleaning hold the GIL, so with `processes` the work is split in
+    a pipeline instead: the threads only fetch pages and each page is handed to a pool of
+    `processes` worker processes running `clean_game_html` as soon as it arrives. Requests to the host are bounded by a shared token-bucket `RateLimiter` to
+    avoid overloading the server, and a request failing with a rate-limiting or server error, a
+    timeout or a dropped connection is retried with backoff by the client. The latency statistics
+    of the requests are printed at the end of the run, and emitted as a 'fetch' event with a
+    recorder. Game ids are assigned from the position of each link in
+    `game_links`, so the output does not depend on the order in which the games finish.
+
+    Each game is appended to the output as soon as it is cleaned, in link order, and flushed to disk.
+    At most two games per thread and process are in flight: a new page is only requested once the
+    oldest game has been written, so memory stays bounded when fetching outpaces parsing, and an
+    interrupted run leaves valid files holding every game finished so far.
+
+    With a manifest, the status of each game is saved as soon as it is written, along with the
+    position of every output after it, and a game that raises an error is marked as failed instead
+    of stopping the run. Running again with the same manifest keeps the game ids of known links,
+    skips completed games, retries failed ones and appends to the existing output, so an
+    interrupted backfill picks up where it stopped. Output written after the last completed game,
+    by a run interrupted between writing a game and saving the manifest, is cut off first so the
+    game is not written twice. An output holding less than the manifest records, e.g. a file
+    deleted or replaced since, raises a ValueError instead of being resumed.
 
     Example
     -------
     >>> game_urls = ['https://www.pro-football-reference.com/boxscores/202309070kan.htm', ...]
-    >>> scrape_games(game_links=game_urls)
+    >>> scrape_games(game_links=game_urls, workers=4, requests_per_second=0.5, cache_dir='html_cache')
+    >>> scrape_games(cache_dir='html_cache', offline=True, processes=8)  # re-clean every cached game on 8 cores
+    >>> scrape_games(game_urls, 'store/plays', 'store/games', data_format='parquet', season=2023, week=1)
+    >>> scrape_games(game_urls, 'nfl.db', 'nfl.db', data_format='sqlite', season=2023, week=1, drive_file_path='nfl.db')
+    >>> scrape_games(game_urls, manifest_path='manifest.json')  # rerun the same call to resume
+    >>> scrape_games(game_urls, 'plays.csv', 'games.csv', drive_file_path='drives.csv')
     """
 
-    games = {
-    'game_id': [], 
-    # 'team1': [], 
-    # 'team2': [],
-    'link': []
-    }
-
-    data = pd.DataFrame({
-        'Quarter': [], 
-        'Time': [], 
-        'Down': [], 
-        'ToGo': [], 
-        'Location': [], 
-        'away': [], 
-        'home': [], 
-        'Detail': [], 
-        'EPB': [],
-        'EPA': [], 
-        'field_side': [], 
-        'yardline': [], 
-        'play_start_time': [], 
-        'Play_Type': [], 
-        'posession': [], 
-        'Yardage': []
-                    })
-    id = 1
-    for link in game_links:
-        game_data = scrape_game_data(link)
-        game_data['game_id'] = id
-        team1 = game_data.columns[5]
-        team2 = game_data.columns[6]
-        # game_data = game_data.rename(columns={game_data.columns[5]: 'team1', 
-        #                             game_data.columns[6]: 'team2'})
-        games['game_id'].append(id)
-        # games['team1'].append(team1)
-        # games['team2'].append(team2)
-        games['link'].append(link)
-        data = pd.concat([data, game_data], axis=0)
-        id = id + 1
-        time.sleep(10)
-    games_df = pd.DataFrame(games)
-    data.to_csv(data_file_path,index=False)
-    games_df.to_csv(game_file_path, index=False)
+    partition = None
+    if data_format == 'sqlite' and (season is None or week is None):
+        raise ValueError('season and week must be given with the sqlite format, since they key the games of the store.')
+    if season is not None or week is not None:
+        if season is None or week is None:
+            raise ValueError('season and week must be given together.')
+        if data_format not in ('parquet', 'sqlite'):
+            raise ValueError('season and week partitions are only supported with the parquet and sqlite formats.')
+        partition = {'season': season, 'week': week}
+
+    if offline and not game_links:
+        game_links = cache.cached_links(cache_dir)
+
+    manifest = None
+    resume = False
+    if manifest_path is not None:
+        manifest = mf.load_manifest(manifest_path)
+        resume = mf.summarize_manifest(manifest)['completed'] > 0
+        mf.add_games(manifest, game_links)
+        mf.save_manifest(manifest, manifest_path)
+        links = iter(mf.games_to_scrape(manifest))
+    else:
+        links = enumerate(game_links, start=1)
+
+    rate_limiters = {}
+    pending = deque()
+    own_client = client is None
+    if own_client:
+        client = fetch.HttpClient(pool_size=workers)
+    with (client if own_client else contextlib.nullcontext()), \
+            (ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(START_METHOD))
+             if processes else contextlib.nullcontext()) as cleaners, \
+            ThreadPoolExecutor(max_workers=workers) as executor, \
+            wf.open_writer(data_file_path, wf.PLAY_COLUMNS, data_format, partition, resume) as data_writer, \
+            wf.open_writer(game_file_path, wf.GAME_COLUMNS, data_format, partition, resume) as game_writer, \
+            (wf.open_writer(drive_file_path, wf.DRIVE_COLUMNS, data_format, partition, resume)
+             if drive_file_path is not None else contextlib.nullcontext()) as drive_writer:
+        writers = {'plays': data_writer, 'games': game_writer}
+        if drive_writer is not None:
+            writers['drives'] = drive_writer
+        if resume:
+            # drop whatever was written after the last completed game, e.g. a game written just
+            # before a crash but never marked completed, since it is scraped again
+            for name, position in (mf.resume_positions(manifest) or {}).items():
+                if name in writers:
+                    writers[name].truncate(position)
+
+        def submit_next():
+            next_link = next(links, None)
+            if next_link is None:
+                return
+            id, link = next_link
+            host = urlparse(link).netloc
+            if host not in rate_limiters:
+                rate_limiters[host] = rate_limiter or RateLimiter(rate=requests_per_second)
+            if cleaners is None:
+                future = executor.submit(scrape_game_data, link, rate_limiters[host], cache_dir, offline, recorder, True, client)
+            else:
+                future = _submit_pipelined(executor, cleaners, link, rate_limiters[host], cache_dir, offline, recorder, client)
+            pending.append((id, link, future))
+
+        # keep at most 2 games per thread and process in flight and write them in link order
+        for _ in range(2 * (workers + processes)):
+            submit_next()
+        while pending:
+            id, link, future = pending.popleft()
+            submit_next()
+            try:
+                game_data, drive_data = future.result()
+            except Exception as e:
+                if manifest is None:
+                    raise
+                print(f'{link} failed: {e!r}')
+                mf.mark_game(manifest, link, 'failed', repr(e))
+                mf.save_manifest(manifest, manifest_path)
+                continue
+            game_data['game_id'] = id
+            with prof.record_game(recorder, link), prof.record_stage(recorder, 'write'):
+                data_writer.write(wf.conform_plays(game_data))
+                teams = game_data.attrs.get('teams', {})
+                game_writer.write(pd.DataFrame({'game_id': [id], 'link': [link], 'away_team': [teams.get('away')], 'home_team': [teams.get('home')]}))
+                if drive_writer is not None:
+                    drive_writer.write(drive_data.assign(game_id=id))
+            if manifest is not None:
+                mf.mark_game(manifest, link, 'completed',
+                             positions={name: writer.position() for name, writer in writers.items()})
+                mf.save_manifest(manifest, manifest_path)
+    fetch_stats = client.stats()
+    if fetch_stats['requests']:
+        print(fetch_stats)
+        if recorder is not None:
+            recorder.emit({'event': 'fetch', **fetch_stats, 'timestamp': time.time()})
+    if manifest is not None:
+        print(mf.summarize_manifest(manifest))
+    if recorder is not None:
+        recorder.emit_summary()
     print('done')
-
-    
\ No newline at end of file
@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import time
+from itertools import product
+import numpy as np
+import pandas as pd
+from nflscraping import predict_functions as pf
+
+# scikit-learn and joblib are imported by the functions using them, like in predict_functions
+
+
+def game_ids(plays):
+    """
+    Number the games of play data, telling apart games of different weeks with the same 'game_id'.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        Play-by-play data, with 'season' and 'week' columns when it spans several weeks, as
+        returned by load_data(name='plays', season=...).
+
+    Returns
+    -------
+    pandas.Series
+        A game number for every play, aligned with `plays`.
+    """
+    keys = [column for column in ('season', 'week', 'game_id') if column in plays.columns]
+    return plays.groupby(keys, sort=False).ngroup()
+
+
+def _fit_fold(X, y, train, test, params):
+    """
+    Fit a forest on the training rows of a fold and score it on the test rows.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    start = time.perf_counter()
+    model = RandomForestClassifier(n_jobs=1, **params).fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+    probabilities = model.predict_proba(X[test])[:, list(model.classes_).index(1.0)]
+    y_test = y[test]
+    return {
+        'accuracy': accuracy_score(y_test, model.predict(X[test])),
+        'auc': roc_auc_score(y_test, probabilities) if len(np.unique(y_test)) == 2 else np.nan,
+        'fit_seconds': fit_seconds
+    }
+
+
+def sweep(plays, param_grid, n_splits=5, n_jobs=-1, random_state=42, memmap_dir=None):
+    """
+    Cross-validate the win model over a grid of hyperparameters, split by game.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        Play-by-play data, in the format accepted by `predict_functions.build_features`.
+    param_grid : dict
+        Lists of values of parameters of the `sklearn.ensemble.RandomForestClassifier`, e.g.
+        {'n_estimators': [100, 400], 'max_depth': [None, 12]}. Every combination is evaluated.
+    n_splits : int, optional
+        Number of folds. Default is 5.
+    n_jobs : int, optional
+        Number of worker processes running the folds, -1 meaning one per core. Default is -1.
+    random_state : int, optional
+        Seed of the forests, unless `param_grid` sets one. Default is 42.
+    memmap_dir : str, optional
+        Directory the feature matrix is written to for the workers. Default is None, meaning
+        a temporary directory removed at the end.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per parameter combination, ranked by mean AUC then mean accuracy, with the mean
+        and standard deviation of the accuracy and AUC over the folds and the mean fit seconds.
+
+    Notes
+    -----
+    - Folds are built with `GroupKFold` on `game_ids`, so the plays of a game are never split
+      between training and test data.
+    - The feature matrix is built once and saved as a float32 .npy file, which every worker
+      maps into memory read-only instead of receiving its own copy.
+    - Every (parameter combination, fold) pair is a separate task, so folds and parameter
+      combinations all run in parallel; each forest is fitted on one core.
+
+    Example
+    -------
+    >>> results = sweep(load_data(name='plays', season=2023),
+    ...                 {'n_estimators': [50, 100], 'max_depth': [None, 4]}, n_splits=4)
+    >>> results[['n_estimators', 'max_depth', 'accuracy', 'auc', 'fit_seconds', 'rank']]
+      n_estimators max_depth  accuracy       auc  fit_seconds  rank
+    0          100      None  0.902332  0.939851     0.517010     1
+    1           50      None  0.905248  0.938697     0.248890     2
+    2          100         4  0.762148  0.837500     0.286471     3
+    3           50         4  0.755588  0.834975     0.133664     4
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import GroupKFold
+
+    plays = plays.assign(game_id=game_ids(plays))
+    X, y = pf.build_features(plays)
+    groups = plays.loc[X.index, 'game_id'].to_numpy()
+    folds = list(GroupKFold(n_splits=n_splits).split(X, y, groups))
+    names = list(param_grid)
+    grid = [{'random_state': random_state, **dict(zip(names, values))} for values in product(*param_grid.values())]
+
+    directory = memmap_dir or tempfile.mkdtemp(prefix='nflscraping-sweep-')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'features.npy')
+        np.save(path, X.to_numpy(dtype=np.float32))
+        features = np.load(path, mmap_mode='r')
+        labels = y.to_numpy()
+        scores = Parallel(n_jobs=n_jobs)(delayed(_fit_fold)(features, labels, train, test, params)
+                                         for params in grid for train, test in folds)
+    finally:
+        if memmap_dir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    rows = []
+    for i, params in enumerate(grid):
+        fold_scores = pd.DataFrame(scores[i * len(folds):(i + 1) * len(folds)])
+        rows.append({**{name: params[name] for name in names},
+                     'accuracy': fold_scores['accuracy'].mean(), 'accuracy_std': fold_scores['accuracy'].std(),
+                     'auc': fold_scores['auc'].mean(), 'auc_std': fold_scores['auc'].std(),
+                     'fit_seconds': fold_scores['fit_seconds'].mean()})
+    results = pd.DataFrame(rows)
+    for name in names:
+        # keep None values, e.g. max_depth=None, instead of letting pandas turn them into NaN
+        results[name] = pd.Series([params[name] for params in grid], dtype=object)
+    results = results.sort_values(['auc', 'accuracy'], ascending=False, ignore_index=True)
+    results['rank'] = np.arange(1, len(results) + 1)
+    return results
+
+
+def cross_validate(plays, n_splits=5, n_jobs=-1, **params):
+    """
+    Cross-validate the win model with one set of hyperparameters, split by game.
+
+    Parameters
+    ----------
+    plays : pandas.DataFrame
+        Play-by-play data, in the format accepted by `predict_functions.build_features`.
+    n_splits : int, optional
+        Number of folds. Default is 5.
+    n_jobs : int, optional
+        Number of worker processes running the folds. Default is -1, one per core.
+    **params
+        Parameters of the `sklearn.ensemble.RandomForestClassifier`, 400 trees by default as in
+        `predict_functions.predict_wins`.
+
+    Returns
+    -------
+    pandas.Series
+        Mean and standard deviation of the accuracy and AUC over the folds and the mean fit
+        seconds, see `sweep`.
+
+    Example
+    -------
+    >>> cross_validate(load_data(name='plays', season=2023), n_splits=4)['auc']
+    0.9406
+    """
+    params = {'n_estimators': 400, **params}
+    return sweep(plays, {name: [value] for name, value in params.items()}, n_splits, n_jobs).iloc[0]
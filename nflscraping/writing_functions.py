@@ -0,0 +1,342 @@
+import os
+import pandas as pd
+from nflscraping import caching_functions as cache
+from nflscraping import clock_functions as clock
+
+# column layout of the play data written by scrape_games
+PLAY_COLUMNS = [
+    'Quarter', 'Time', 'Down', 'ToGo', 'Location', 'away', 'home', 'Detail', 'EPB', 'EPA',
+    'field_side', 'yardline', 'play_start_time', 'Play_Type', 'posession', 'Yardage',
+    'possession', 'game_id'
+]
+GAME_COLUMNS = ['game_id', 'link', 'away_team', 'home_team']
+# column layout of the drive data written by scrape_games, see cleaning_functions.summarize_drives
+DRIVE_COLUMNS = [
+    'game_id', 'drive', 'possession', 'Quarter', 'Time', 'LOS', 'Plays', 'Length', 'Net Yds', 'Result',
+    'start_time', 'end_time', 'first_play', 'last_play'
+]
+FORMATS = ['csv', 'parquet', 'sqlite']
+
+SIDE_DTYPE = pd.CategoricalDtype(['away', 'home'])
+
+# compact column types of play data, used by the scraper, the writers and the loader alike;
+# small counts are nullable integers since downs, distances and scores are missing on some plays
+PLAY_DTYPES = {
+    'Quarter': 'int8',
+    'Time': 'string',
+    'Down': 'Int8',
+    'ToGo': 'Int8',
+    'Location': 'string',
+    'away': 'Int16',
+    'home': 'Int16',
+    'Detail': 'string',
+    'EPB': 'float32',
+    'EPA': 'float32',
+    'field_side': SIDE_DTYPE,
+    'yardline': 'Int8',
+    'play_start_time': 'float32',
+    'Play_Type': 'category',
+    'Yardage': 'Int8',
+    'possession': SIDE_DTYPE,
+    'game_id': 'int32'
+}
+# compact column types of drive data; the columns shared with play data have the same types
+DRIVE_DTYPES = {
+    'drive': 'int16',
+    'Plays': 'Int16',
+    'Net Yds': 'Int16',
+    'start_time': 'float32',
+    'end_time': 'float32',
+    'first_play': 'Int16',
+    'last_play': 'Int16'
+}
+# column types of the parquet datasets; columns not listed are stored as strings
+PARQUET_DTYPES = {**PLAY_DTYPES, **DRIVE_DTYPES, 'link': 'string'}
+
+
+def conform_plays(game_data):
+    """
+    Put the plays of a game in the column layout of the play data file.
+
+    Parameters
+    ----------
+    game_data : pandas.DataFrame
+        Cleaned play-by-play data of one game, as returned by scrape_game_data, with a 'game_id' column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The plays with the columns in `PLAY_COLUMNS`, typed with `type_columns`. The always empty
+        'posession' column is kept, as in the play data files bundled with the package.
+    """
+    return type_columns(game_data).reindex(columns=PLAY_COLUMNS)
+
+
+def type_columns(frame):
+    """
+    Convert the columns of play, drive or game data to the compact types of `PARQUET_DTYPES`.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Play, drive or game data, e.g. as scraped, with numbers still held as strings.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A copy of `frame` with the columns in `PARQUET_DTYPES` converted to those types, the
+        'OT' quarter stored as 5, and any other object column stored as strings. The always
+        empty 'posession' column is dropped.
+
+    Notes
+    -----
+    Play data typed this way takes about a third of the memory of the all-object frames the
+    scraper used to return, see benchmarks/memory_footprint.py.
+    """
+    frame = frame.drop(columns=['posession'], errors='ignore')
+    for column in frame.columns:
+        dtype = PARQUET_DTYPES.get(column)
+        if column == 'Quarter':
+            frame[column] = clock.quarter_numbers(frame[column]).astype(dtype)
+        elif dtype == 'category' or dtype == 'string':
+            frame[column] = frame[column].astype(dtype)
+        elif dtype is not None:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype(dtype)
+        elif frame[column].dtype == object:
+            frame[column] = frame[column].astype('string')
+    return frame
+
+
+class CsvWriter:
+    """
+    Append-only CSV sink that writes a frame at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file. It is replaced by a file holding only the header.
+    columns : list of str
+        Columns of the file, in order.
+    append : bool, optional
+        If True and the file exists, rows are appended to it instead, after dropping a trailing
+        partial line left by an interrupted write. Default is False.
+
+    Notes
+    -----
+    Each call to `write` formats the whole frame in memory, appends it with a single write and
+    flushes it to disk before returning, so an interrupted run leaves a valid CSV holding every
+    frame written so far. `position` is the size of the file, and `truncate` cuts the file back
+    to a size returned by `position`.
+
+    Example
+    -------
+    >>> with CsvWriter('data.csv', PLAY_COLUMNS) as writer:
+    ...     writer.write(conform_plays(game_data))
+    """
+
+    def __init__(self, path, columns, append=False):
+        self.path = path
+        self.columns = list(columns)
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            _truncate_partial_line(path)
+        else:
+            cache.write_atomic(path, pd.DataFrame(columns=self.columns).to_csv(index=False).encode('utf-8'))
+        self._file = open(path, 'ab')
+
+    def write(self, frame):
+        """
+        Append the rows of `frame` to the file and flush them to disk.
+        """
+        chunk = frame.reindex(columns=self.columns).to_csv(index=False, header=False)
+        self._file.write(chunk.encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self):
+        """
+        Return the size of the file in bytes, the point `truncate` can later cut it back to.
+        """
+        return self._file.tell()
+
+    def truncate(self, position):
+        """
+        Drop every row written after `position`, a value returned by `position`.
+
+        Raises
+        ------
+        ValueError
+            If the file is shorter than `position`, i.e. it was replaced or cut since `position`
+            was taken, so rows recorded as written are missing.
+        """
+        size = os.path.getsize(self.path)
+        if size < position:
+            raise ValueError(f'{self.path} holds {size} bytes, fewer than the {position} written before; '
+                             'it was replaced since. Remove the manifest to scrape every game again.')
+        self._file.truncate(position)
+        self._file.seek(position)
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetWriter:
+    """
+    Columnar sink that writes each frame as a new Parquet file of a dataset directory.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the dataset. Parts left by an earlier run in the same partition are removed.
+    columns : list of str
+        Columns of the dataset, in order.
+    partition : dict, optional
+        Partition keys and values, e.g. {'season': 2023, 'week': 1}. The parts are then written
+        to the hive-style subdirectory 'season=2023/week=1' of `path`. Default is None.
+    append : bool, optional
+        If True, parts left by an earlier run are kept and new parts are numbered after them.
+        Default is False.
+
+    Notes
+    -----
+    Every call to `write` creates a file named 'part-00001.parquet', 'part-00002.parquet', ...
+    through a temporary file and an atomic rename, so the directory only ever holds complete
+    parts and can be read at any time with `pandas.read_parquet(path)`. Columns are typed with
+    `type_columns`. `position` is the number of the last part, and `truncate` removes the parts
+    written after it. Requires pyarrow.
+
+    Example
+    -------
+    >>> with ParquetWriter('plays', PLAY_COLUMNS) as writer:
+    ...     writer.write(conform_plays(game_data))
+    """
+
+    def __init__(self, path, columns, partition=None, append=False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError('Writing parquet files requires pyarrow. Install it with: pip install pyarrow')
+        if partition:
+            path = os.path.join(path, *[f'{key}={value}' for key, value in partition.items()])
+        self.path = path
+        self.columns = list(columns)
+        os.makedirs(path, exist_ok=True)
+        self._parts = 0
+        for name in os.listdir(path):
+            if name.startswith('part-') and name.endswith('.parquet'):
+                if append:
+                    self._parts = max(self._parts, int(name[len('part-'):-len('.parquet')]))
+                else:
+                    os.remove(os.path.join(path, name))
+
+    def write(self, frame):
+        """
+        Write `frame` as the next part of the dataset.
+        """
+        frame = type_columns(frame.reindex(columns=self.columns))
+        self._parts += 1
+        part_path = os.path.join(self.path, f'part-{self._parts:05d}.parquet')
+        with cache.atomic_path(part_path) as tmp_path:
+            frame.to_parquet(tmp_path, index=False)
+
+    def position(self):
+        """
+        Return the number of the last part, the point `truncate` can later cut the dataset back to.
+        """
+        return self._parts
+
+    def truncate(self, position):
+        """
+        Remove every part written after `position`, a value returned by `position`.
+
+        Raises
+        ------
+        ValueError
+            If the dataset holds fewer parts than `position`, i.e. parts recorded as written were
+            removed since `position` was taken.
+        """
+        if self._parts < position:
+            raise ValueError(f'{self.path} holds {self._parts} parts, fewer than the {position} written before; '
+                             'parts were removed since. Remove the manifest to scrape every game again.')
+        for name in os.listdir(self.path):
+            if name.startswith('part-') and name.endswith('.parquet') and int(name[len('part-'):-len('.parquet')]) > position:
+                os.remove(os.path.join(self.path, name))
+        self._parts = position
+
+    def close(self):
+        """
+        Nothing to release: every part is complete once `write` returns.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_writer(path, columns, format='csv', partition=None, append=False):
+    """
+    Open a streaming sink for play or game data.
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file, directory of the Parquet dataset, or SQLite database file.
+    columns : list of str
+        Columns of the output, in order. With the 'sqlite' format, they pick the table written to.
+    format : str, optional
+        One of 'csv', 'parquet' and 'sqlite'. Default is 'csv'.
+    partition : dict, optional
+        Partition of a parquet dataset, or season and week of the SQLite rows, the output is
+        written to, see `ParquetWriter`. Default is None.
+    append : bool, optional
+        If True, existing output is kept and new data is added after it. Default is False.
+
+    Returns
+    -------
+    CsvWriter, ParquetWriter or database_functions.SqliteWriter
+        The opened writer.
+
+    Raises
+    ------
+    ValueError
+        If `format` is not one of `FORMATS`.
+    """
+    if format == 'csv':
+        return CsvWriter(path, columns, append)
+    if format == 'parquet':
+        return ParquetWriter(path, columns, partition, append)
+    if format == 'sqlite':
+        from nflscraping import database_functions as db
+
+        return db.SqliteWriter(path, columns, partition, append)
+    raise ValueError(f"{format} is not a recognized format. The only formats are {FORMATS}.")
+
+
+def _truncate_partial_line(path):
+    """
+    Drop the bytes after the last newline of a file, i.e. a row whose write was interrupted.
+    """
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                if start + newline + 1 < end:
+                    f.truncate(start + newline + 1)
+                return
+            position = start
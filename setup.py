@@ -19,6 +19,6 @@ setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     exclude=['Game Data Collection.ipynb', 'ben_testing.ipynb', 'Random_forest_test.ipynb'],
-    package_data = {'mypackage': ['data/*.csv']}
+    package_data = {'nflscraping': ['data/*.csv']}
 )
 
@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+from nflscraping import caching_functions as cache
+from nflscraping import loading_functions as lf
+from nflscraping import planning_functions as pl
+from nflscraping import scraping_functions as sf
+from benchmarks import fixtures
+
+GAME_URL = 'https://www.pro-football-reference.com/boxscores/20230910{game_id}nyj.htm'
+
+
+def _cache_week(cache_dir, season=2023, week=1, games=2):
+    """
+    Cache the first bundled games of a week as boxscore pages, and a schedule page linking to them.
+    """
+    plays = lf.load_data(name='plays', season=season, week=week)
+    links = []
+    for game_id, game in list(plays.groupby('game_id', sort=True))[:games]:
+        link = GAME_URL.format(game_id=game_id)
+        cache.write_cached_html(link, fixtures.render_boxscore(game), cache_dir)
+        links.append(link)
+    schedule = ''.join(f'<a href="{link[len(pl.BASE_URL):]}">Final</a>' for link in links)
+    cache.write_cached_html(pl.schedule_url(season, week), f'<html><body>{schedule}</body></html>',
+                            os.path.join(cache_dir, pl.SCHEDULE_CACHE_DIR))
+    return links
+
+
+def test_offline_backfill_then_cache_rebuild(tmp_path):
+    cache_dir = str(tmp_path / 'html_cache')
+    links = _cache_week(cache_dir)
+
+    report = pl.run_backfill(2023, [1], str(tmp_path / 'store'), cache_dir, offline=True)
+    assert report['games_planned'] == len(links)
+    assert report['games_processed'] == len(links)
+    assert cache.cached_links(cache_dir) == sorted(links)
+
+    plays_path, games_path = str(tmp_path / 'plays.csv'), str(tmp_path / 'games.csv')
+    sf.scrape_games([], plays_path, games_path, cache_dir=cache_dir, offline=True)
+    assert sorted(pd.read_csv(plays_path)['game_id'].unique()) == list(range(1, len(links) + 1))
+    assert len(pd.read_csv(games_path)) == len(links)